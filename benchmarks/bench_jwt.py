@@ -0,0 +1,52 @@
+"""
+Microbenchmark of the precompiled JWT codec against PyJWT.
+
+Usage (with the application settings available in the environment / .env):
+    python -m benchmarks.bench_jwt
+"""
+
+import timeit
+from datetime import UTC, datetime, timedelta
+
+import jwt
+from src.config import settings
+from src.utils.jwt_codec import TokenCodec
+
+NUMBER = 20_000
+
+
+def main():
+    key, algorithm = settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM
+    codec = TokenCodec(key=key, algorithm=algorithm)
+    payload = {
+        'sub': 'a0c5b4d8-57a9-4e55-a1c1-6a2bbd2a5c7f',
+        'rank': 1020,
+        'username': 'testuser',
+        'exp': datetime.now(UTC) + timedelta(minutes=15),
+    }
+    token = codec.encode(payload)
+    assert token == jwt.encode(payload, key, algorithm=algorithm)
+
+    cases = {
+        'encode': (
+            lambda: jwt.encode(payload, key, algorithm=algorithm),
+            lambda: codec.encode(payload),
+        ),
+        'decode': (
+            lambda: jwt.decode(token, key, algorithms=[algorithm]),
+            lambda: codec.decode(token),
+        ),
+    }
+
+    print(f'{algorithm}, {NUMBER} iterations (fast path: {codec.fast_path})')
+    for name, (pyjwt_call, codec_call) in cases.items():
+        pyjwt_us = min(timeit.repeat(pyjwt_call, number=NUMBER, repeat=5)) / NUMBER
+        codec_us = min(timeit.repeat(codec_call, number=NUMBER, repeat=5)) / NUMBER
+        print(
+            f'{name:<8} PyJWT {pyjwt_us * 1e6:7.2f} µs   '
+            f'codec {codec_us * 1e6:7.2f} µs   x{pyjwt_us / codec_us:.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Microbenchmark of the user serialization fast path against FastAPI's
+response_model path (validate, serialize, then json.dumps in JSONResponse).
+
+Usage (with the application settings available in the environment / .env):
+    python -m benchmarks.bench_serialization
+"""
+
+import asyncio
+import timeit
+import uuid
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from src.db.models import User
+from src.schemes.user import UserPublic
+from src.utils.serialization import users_json
+
+SIZES = (1, 50, 500)
+REPEAT = 5
+
+
+def make_users(count: int) -> list[User]:
+    now = datetime.now()
+    return [
+        User(
+            username=f'user{i}',
+            email=f'user{i}@mail.com',
+            uid=uuid.uuid4(),
+            hashed_password='$2b$12$' + 'x' * 53,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    field = create_model_field(
+        name='Response_read_users', type_=list[UserPublic], mode='serialization'
+    )
+    loop = asyncio.new_event_loop()
+
+    def fastapi_path(users):
+        content = loop.run_until_complete(
+            serialize_response(field=field, response_content=users)
+        )
+        return JSONResponse(content).body
+
+    print(f'{"rows":>6} {"FastAPI":>12} {"fast path":>12}')
+    for size in SIZES:
+        users = make_users(size)
+        number = max(10, 20_000 // size)
+        assert fastapi_path(users).replace(b' ', b'') == users_json(users)
+
+        fastapi_us = min(
+            timeit.repeat(
+                lambda users=users: fastapi_path(users), number=number, repeat=REPEAT
+            )
+        )
+        fast_us = min(
+            timeit.repeat(
+                lambda users=users: users_json(users), number=number, repeat=REPEAT
+            )
+        )
+        print(
+            f'{size:>6} {fastapi_us / number * 1e6:9.1f} µs '
+            f'{fast_us / number * 1e6:9.1f} µs   x{fastapi_us / fast_us:.1f}'
+        )
+    loop.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Key users_fts on stable ids.
+
+Revision ID: a7d3c9e2b461
+Revises: f2c8a5d71e43
+Create Date: 2026-10-18 21:12:07.483915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3c9e2b461'
+down_revision: Union[str, None] = 'f2c8a5d71e43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS users_fts_au')
+    op.execute('DROP TRIGGER IF EXISTS users_fts_ad')
+    op.execute('DROP TRIGGER IF EXISTS users_fts_ai')
+    op.execute('DROP TABLE IF EXISTS users_fts')
+    op.execute(
+        'CREATE TABLE users_fts_keys (id INTEGER PRIMARY KEY, username TEXT NOT NULL UNIQUE)'
+    )
+    op.execute(
+        "CREATE VIRTUAL TABLE users_fts USING fts5(username, email, content='', tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+    )
+    op.execute(
+        'CREATE TRIGGER users_fts_ai AFTER INSERT ON users BEGIN INSERT INTO users_fts_keys(username) VALUES (new.username); INSERT INTO users_fts(rowid, username, email) VALUES ((SELECT id FROM users_fts_keys WHERE username = new.username), new.username, new.email); END'
+    )
+    op.execute(
+        "CREATE TRIGGER users_fts_ad AFTER DELETE ON users BEGIN INSERT INTO users_fts(users_fts, rowid, username, email) VALUES ('delete', (SELECT id FROM users_fts_keys WHERE username = old.username), old.username, old.email); DELETE FROM users_fts_keys WHERE username = old.username; END"
+    )
+    op.execute(
+        "CREATE TRIGGER users_fts_au AFTER UPDATE OF username, email ON users BEGIN INSERT INTO users_fts(users_fts, rowid, username, email) VALUES ('delete', (SELECT id FROM users_fts_keys WHERE username = old.username), old.username, old.email); UPDATE users_fts_keys SET username = new.username WHERE username = old.username; INSERT INTO users_fts(rowid, username, email) VALUES ((SELECT id FROM users_fts_keys WHERE username = new.username), new.username, new.email); END"
+    )
+    # Indexe les utilisateurs existants
+    op.execute('INSERT INTO users_fts_keys(username) SELECT username FROM users')
+    op.execute(
+        'INSERT INTO users_fts(rowid, username, email) SELECT k.id, u.username, u.email FROM users u JOIN users_fts_keys k ON k.username = u.username'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS users_fts_au')
+    op.execute('DROP TRIGGER IF EXISTS users_fts_ad')
+    op.execute('DROP TRIGGER IF EXISTS users_fts_ai')
+    op.execute('DROP TABLE IF EXISTS users_fts')
+    op.execute('DROP TABLE IF EXISTS users_fts_keys')
+    op.execute(
+        "CREATE VIRTUAL TABLE users_fts USING fts5(username, email, content='users', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+    )
+    op.execute(
+        'CREATE TRIGGER users_fts_ai AFTER INSERT ON users BEGIN INSERT INTO users_fts(rowid, username, email) VALUES (new.rowid, new.username, new.email); END'
+    )
+    op.execute(
+        "CREATE TRIGGER users_fts_ad AFTER DELETE ON users BEGIN INSERT INTO users_fts(users_fts, rowid, username, email) VALUES ('delete', old.rowid, old.username, old.email); END"
+    )
+    op.execute(
+        "CREATE TRIGGER users_fts_au AFTER UPDATE OF username, email ON users BEGIN INSERT INTO users_fts(users_fts, rowid, username, email) VALUES ('delete', old.rowid, old.username, old.email); INSERT INTO users_fts(rowid, username, email) VALUES (new.rowid, new.username, new.email); END"
+    )
+    op.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
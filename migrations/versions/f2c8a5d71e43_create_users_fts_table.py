@@ -0,0 +1,45 @@
+"""Create users_fts table.
+
+Revision ID: f2c8a5d71e43
+Revises: d6a94e1f3b08
+Create Date: 2026-10-18 16:40:52.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8a5d71e43'
+down_revision: Union[str, None] = 'd6a94e1f3b08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "CREATE VIRTUAL TABLE users_fts USING fts5(username, email, content='users', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+    )
+    op.execute(
+        'CREATE TRIGGER users_fts_ai AFTER INSERT ON users BEGIN INSERT INTO users_fts(rowid, username, email) VALUES (new.rowid, new.username, new.email); END'
+    )
+    op.execute(
+        "CREATE TRIGGER users_fts_ad AFTER DELETE ON users BEGIN INSERT INTO users_fts(users_fts, rowid, username, email) VALUES ('delete', old.rowid, old.username, old.email); END"
+    )
+    op.execute(
+        "CREATE TRIGGER users_fts_au AFTER UPDATE OF username, email ON users BEGIN INSERT INTO users_fts(users_fts, rowid, username, email) VALUES ('delete', old.rowid, old.username, old.email); INSERT INTO users_fts(rowid, username, email) VALUES (new.rowid, new.username, new.email); END"
+    )
+    # Indexe les utilisateurs existants
+    op.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS users_fts_au')
+    op.execute('DROP TRIGGER IF EXISTS users_fts_ad')
+    op.execute('DROP TRIGGER IF EXISTS users_fts_ai')
+    op.execute('DROP TABLE IF EXISTS users_fts')
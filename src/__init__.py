@@ -1,20 +1,69 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlmodel import text
 
-from src.db.main import engine, init_db
+from src.config import settings
+from src.db.main import async_session, engine, init_db
+from src.db.sqlite import read_sqlite_pragmas
+from src.db.writer import write_queue
 from src.routes.auth import router as auth_router
+from src.routes.internal import router as internal_router
+from src.routes.metrics import router as metrics_router
 from src.routes.user import router as user_router
+from src.services.refresh_token import (
+    load_revoked_refresh_tokens,
+    prune_refresh_tokens_periodically,
+)
+from src.services.availability import availability_index
+from src.services.user import warm_user_cache
+from src.utils.invalidation import invalidation_bus
+from src.utils.metrics import MetricsMiddleware
+from src.utils.request_context import RequestContextMiddleware
+from src.utils.security import (
+    calibrate_bcrypt_rounds,
+    configure_password_context,
+    shutdown_hash_pool,
+    start_hash_pool,
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print('=' * 50, ' Starting up... ', '=' * 50)
     await init_db()
+    print(f'🗄️  Profil SQLite : {settings.SQLITE_PROFILE}')
+    for name, value in (await read_sqlite_pragmas(engine)).items():
+        print(f'    {name} = {value}')
+
+    bcrypt_rounds = settings.BCRYPT_ROUNDS or calibrate_bcrypt_rounds()
+    configure_password_context(bcrypt_rounds)
+    print(f'🔐 Coût bcrypt : {bcrypt_rounds} rounds')
+    if settings.BCRYPT_ROUNDS is None:
+        print(
+            f'⚠️  Coût calibré : avec plusieurs workers, fixer BCRYPT_ROUNDS={bcrypt_rounds}'
+        )
+    start_hash_pool()
+    await invalidation_bus.start()
+    await write_queue.start()
+
+    async with async_session() as session:
+        revoked_count = await load_revoked_refresh_tokens(session)
+        cached_count = await warm_user_cache(session)
+        taken_count = await availability_index.load(session)
+    print(f'🔑 {revoked_count} refresh token(s) révoqué(s) chargé(s).')
+    print(f'👤 {cached_count} utilisateur(s) préchargé(s) en cache.')
+    print(f'🔎 {taken_count} username(s)/email(s) chargé(s) dans les filtres.')
+    prune_task = asyncio.create_task(prune_refresh_tokens_periodically())
     yield
 
+    prune_task.cancel()
+    await write_queue.stop()
+    await invalidation_bus.stop()
+    shutdown_hash_pool()
+
     # Exécute le checkpoint WAL pour forcer la sauvegarde de la db
     async with engine.begin() as conn:
         await conn.execute(text('PRAGMA wal_checkpoint(FULL);'))
@@ -38,7 +87,15 @@ app.add_middleware(
     allow_methods=['*'],
     allow_headers=['*'],
 )
+# Route courante dans une ContextVar, lue par le journal des requêtes lentes
+app.add_middleware(RequestContextMiddleware)
+# Ajouté en dernier : le plus externe, il mesure aussi les middlewares
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 
 app.include_router(user_router)
 app.include_router(auth_router)
+app.include_router(internal_router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
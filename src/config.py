@@ -1,3 +1,5 @@
+import os
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,6 +11,80 @@ class Settings(BaseSettings):
     JWT_ACCESS_EXPIRATION_IN_MIN: int
     JWT_REFRESH_EXPIRATION_IN_HOURS: int
 
+    # Pool de connexions de la base (stats sur /internal/db/pool)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_PRE_PING: bool = False
+    # echo=True journalise chaque requête avec ses paramètres : debug local uniquement
+    DB_ECHO: bool = False
+    # Journal des requêtes lentes (None = désactivé) et fraction des autres échantillonnée
+    DB_SLOW_QUERY_MS: float | None = 100
+    DB_QUERY_SAMPLE_RATE: float = 0.0
+    # Connexions en lecture seule (PRAGMA query_only) et file du writer unique
+    DB_READ_POOL_SIZE: int = 5
+    DB_READ_MAX_OVERFLOW: int = 10
+    DB_WRITE_MAX_BATCH: int = 64
+    # Profil de PRAGMA SQLite ('performance', 'durable' ou 'sqlite') et surcharges
+    SQLITE_PROFILE: str = 'performance'
+    SQLITE_JOURNAL_MODE: str | None = None
+    SQLITE_SYNCHRONOUS: str | None = None
+    SQLITE_CACHE_SIZE: int | None = None
+    SQLITE_MMAP_SIZE: int | None = None
+    SQLITE_TEMP_STORE: str | None = None
+    SQLITE_BUSY_TIMEOUT_MS: int | None = None
+    SQLITE_FOREIGN_KEYS: bool | None = None
+
+    # Nombre de process dédiés au hachage bcrypt (0 = pool de threads par défaut)
+    PASSWORD_HASH_WORKERS: int = os.cpu_count() or 1
+    # Coût bcrypt fixe ; si absent, calibré au démarrage pour viser BCRYPT_TARGET_MS.
+    # Avec plusieurs workers, fixer BCRYPT_ROUNDS : chacun calibrerait de son côté
+    BCRYPT_ROUNDS: int | None = None
+    BCRYPT_TARGET_MS: float = 250
+    BCRYPT_MIN_ROUNDS: int = 10
+    BCRYPT_MAX_ROUNDS: int = 16
+    # Admission sur les chemins de hachage : au-delà de la file, réponse 503
+    HASH_MAX_CONCURRENCY: int | None = None
+    HASH_MAX_QUEUE: int = 64
+    # Limitation des tentatives de login (token bucket par IP et par username)
+    LOGIN_RATE_IP_BURST: int = 20
+    LOGIN_RATE_IP_PER_MINUTE: float = 10
+    LOGIN_RATE_USERNAME_BURST: int = 5
+    LOGIN_RATE_USERNAME_PER_MINUTE: float = 2
+    LOGIN_RATE_MAX_KEYS: int = 100_000
+    # Cache des access tokens décodés (0 = désactivé)
+    ACCESS_TOKEN_CACHE_SIZE: int = 10_000
+    # Autorise depuis les claims du token, sans requête DB (rank figé jusqu'à expiration)
+    AUTH_STATELESS: bool = False
+    # Rotation des refresh tokens : filtre de Bloom des jti révoqués + purge périodique
+    REVOKED_JTI_BLOOM_CAPACITY: int = 100_000
+    REFRESH_TOKEN_PRUNE_INTERVAL_SECONDS: int = 3600
+    REFRESH_TOKEN_PRUNE_BATCH: int = 1000
+    # Cache des utilisateurs (TTL + LRU), préchargé au démarrage
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: float = 60
+    USER_CACHE_WARM_SIZE: int = 1000
+    # Cache des réponses encodées de GET /users/ et /users/{username} (0 = désactivé)
+    RESPONSE_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    RESPONSE_CACHE_TTL_SECONDS: float = 60
+    # Pagination de GET /users/
+    USERS_PAGE_SIZE: int = 50
+    USERS_PAGE_MAX_SIZE: int = 500
+    # Export en streaming : lignes lues et envoyées par lot
+    USERS_EXPORT_BATCH: int = 1000
+    # Import en masse : lignes hachées et insérées par lot
+    USERS_IMPORT_BATCH: int = 1000
+    # Erreurs détaillées dans la réponse d'un import, les suivantes sont comptées
+    USERS_IMPORT_MAX_ERRORS: int = 1000
+    # Filtres de Bloom des usernames et emails pris (GET /auth/available)
+    AVAILABILITY_BLOOM_CAPACITY: int = 1_000_000
+    # Endpoint /metrics (format Prometheus) et instrumentation HTTP/SQL
+    METRICS_ENABLED: bool = True
+    # Bus d'invalidation entre workers : 'local' (un seul worker) ou 'sqlite'
+    INVALIDATION_BACKEND: str = 'local'
+    INVALIDATION_SQLITE_PATH: str = './src/db/invalidation.sqlite'
+    INVALIDATION_POLL_INTERVAL_SECONDS: float = 0.5
+
     model_config = SettingsConfigDict(
         env_file='.env', env_file_encoding='utf-8', extra='ignore'
     )
@@ -0,0 +1,67 @@
+import re
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+AUDITED_STATEMENTS = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+SCAN_PATTERN = re.compile(r'^SCAN (?!CONSTANT ROW)\S+')
+WHERE_PATTERN = re.compile(r'\bWHERE\b', re.IGNORECASE)
+
+
+class QueryPlanAuditor:
+    """
+    Run `EXPLAIN QUERY PLAN` on every distinct statement sent through an engine.
+
+    A statement is flagged when it filters rows (WHERE clause) but SQLite
+    plans a full table scan for it, or has to build an automatic index at
+    query time: both mean no index backs the filter. Scans without a WHERE
+    clause (listing a whole table) are expected and ignored. SQLite only.
+    """
+
+    def __init__(self):
+        # statement -> lignes "detail" du plan
+        self.plans: dict[str, list[str]] = {}
+        self.flagged: dict[str, list[str]] = {}
+
+    def attach(self, engine: AsyncEngine) -> None:
+        event.listen(engine.sync_engine, 'after_cursor_execute', self._audit)
+
+    def detach(self, engine: AsyncEngine) -> None:
+        event.remove(engine.sync_engine, 'after_cursor_execute', self._audit)
+
+    def _audit(self, conn, cursor, statement, parameters, context, executemany):
+        if statement in self.plans or conn.dialect.name != 'sqlite':
+            return
+        if not statement.lstrip().upper().startswith(AUDITED_STATEMENTS):
+            return
+        if executemany:
+            parameters = parameters[0]
+
+        explain_cursor = conn.connection.cursor()
+        try:
+            explain_cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)
+            plan = [row[-1] for row in explain_cursor.fetchall()]
+        finally:
+            explain_cursor.close()
+
+        self.plans[statement] = plan
+        if WHERE_PATTERN.search(statement):
+            scans = [
+                detail
+                for detail in plan
+                if (SCAN_PATTERN.match(detail) and 'INDEX' not in detail)
+                or 'AUTOMATIC' in detail
+            ]
+            if scans:
+                self.flagged[statement] = scans
+
+    def report(self) -> str:
+        lines = [
+            f'{len(self.plans)} statement(s) audited, '
+            f'{len(self.flagged)} full table scan(s) without index.'
+        ]
+        for statement, scans in self.flagged.items():
+            lines.append('')
+            lines.append(' '.join(statement.split()))
+            lines.extend(f'    -> {detail}' for detail in scans)
+        return '\n'.join(lines)
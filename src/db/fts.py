@@ -0,0 +1,40 @@
+# Index plein texte FTS5 des usernames et emails, sans contenu (seul l'index est stocké)
+USERS_FTS_TABLE = 'users_fts'
+# Clé entière stable de chaque username : les rowid de users (clé primaire TEXT)
+# peuvent être renumérotés par un VACUUM, ceux d'une INTEGER PRIMARY KEY non
+USERS_FTS_KEYS_TABLE = 'users_fts_keys'
+
+_FTS_KEY = f'(SELECT id FROM {USERS_FTS_KEYS_TABLE} WHERE username = {{}}.username)'
+
+USERS_FTS_DDL = (
+    f'CREATE TABLE {USERS_FTS_KEYS_TABLE} ('
+    'id INTEGER PRIMARY KEY, username TEXT NOT NULL UNIQUE)',
+    f'CREATE VIRTUAL TABLE {USERS_FTS_TABLE} USING fts5('
+    "username, email, content='', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')",
+    f'CREATE TRIGGER {USERS_FTS_TABLE}_ai AFTER INSERT ON users BEGIN '
+    f'INSERT INTO {USERS_FTS_KEYS_TABLE}(username) VALUES (new.username); '
+    f'INSERT INTO {USERS_FTS_TABLE}(rowid, username, email) '
+    f'VALUES ({_FTS_KEY.format("new")}, new.username, new.email); END',
+    f'CREATE TRIGGER {USERS_FTS_TABLE}_ad AFTER DELETE ON users BEGIN '
+    f'INSERT INTO {USERS_FTS_TABLE}({USERS_FTS_TABLE}, rowid, username, email) '
+    f"VALUES ('delete', {_FTS_KEY.format('old')}, old.username, old.email); "
+    f'DELETE FROM {USERS_FTS_KEYS_TABLE} WHERE username = old.username; END',
+    f'CREATE TRIGGER {USERS_FTS_TABLE}_au AFTER UPDATE OF username, email ON users '
+    f'BEGIN INSERT INTO {USERS_FTS_TABLE}({USERS_FTS_TABLE}, rowid, username, email) '
+    f"VALUES ('delete', {_FTS_KEY.format('old')}, old.username, old.email); "
+    f'UPDATE {USERS_FTS_KEYS_TABLE} SET username = new.username '
+    'WHERE username = old.username; '
+    f'INSERT INTO {USERS_FTS_TABLE}(rowid, username, email) '
+    f'VALUES ({_FTS_KEY.format("new")}, new.username, new.email); END',
+)
+
+# Réindexe tout le contenu de users (création de l'index sur une base existante)
+USERS_FTS_REBUILD = (
+    f"INSERT INTO {USERS_FTS_TABLE}({USERS_FTS_TABLE}) VALUES ('delete-all')",
+    f'DELETE FROM {USERS_FTS_KEYS_TABLE}',
+    f'INSERT INTO {USERS_FTS_KEYS_TABLE}(username) SELECT username FROM users',
+    f'INSERT INTO {USERS_FTS_TABLE}(rowid, username, email) '
+    f'SELECT k.id, u.username, u.email FROM users u '
+    f'JOIN {USERS_FTS_KEYS_TABLE} k ON k.username = u.username',
+)
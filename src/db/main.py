@@ -1,11 +1,77 @@
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.config import settings
+from src.db.metrics import instrument_engine
+from src.db.pool import InstrumentedAsyncPool
+from src.db.slow_query import SlowQueryLogger
+from src.db.sqlite import (
+    apply_sqlite_pragmas,
+    resolve_sqlite_pragmas,
+    use_explicit_transactions,
+)
 
-engine = create_async_engine(url=settings.DATABASE_URL, echo=True)
+engine = create_async_engine(
+    url=settings.DATABASE_URL,
+    echo=settings.DB_ECHO,
+    poolclass=InstrumentedAsyncPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+# PRAGMA du profil SQLite, appliqués à chaque nouvelle connexion du pool
+sqlite_pragmas = resolve_sqlite_pragmas()
+apply_sqlite_pragmas(engine, sqlite_pragmas)
+
+# Pool séparé pour les lectures : SQLite refuse toute écriture sur ces connexions
+read_engine = create_async_engine(
+    url=settings.DATABASE_URL,
+    echo=settings.DB_ECHO,
+    poolclass=InstrumentedAsyncPool,
+    pool_size=settings.DB_READ_POOL_SIZE,
+    max_overflow=settings.DB_READ_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+apply_sqlite_pragmas(read_engine, sqlite_pragmas | {'query_only': 'ON'})
+
+# Connexion dédiée au writer : hors du pool des requêtes, qui peuvent l'attendre
+write_engine = create_async_engine(
+    url=settings.DATABASE_URL,
+    echo=settings.DB_ECHO,
+    poolclass=InstrumentedAsyncPool,
+    pool_size=1,
+    max_overflow=0,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+apply_sqlite_pragmas(write_engine, sqlite_pragmas)
+# Un vrai BEGIN autour des SAVEPOINT : sinon chaque unité est commitée seule
+use_explicit_transactions(write_engine, begin='BEGIN IMMEDIATE')
+
+if settings.METRICS_ENABLED:
+    instrument_engine(engine, 'default')
+    instrument_engine(read_engine, 'read')
+    instrument_engine(write_engine, 'writer')
+
+# Remplace echo : seules les requêtes lentes (et un échantillon) sont journalisées
+slow_query_logger = SlowQueryLogger(
+    threshold_ms=settings.DB_SLOW_QUERY_MS, sample_rate=settings.DB_QUERY_SAMPLE_RATE
+)
+if settings.DB_SLOW_QUERY_MS is not None or settings.DB_QUERY_SAMPLE_RATE:
+    slow_query_logger.attach(engine, 'default')
+    slow_query_logger.attach(read_engine, 'read')
+    slow_query_logger.attach(write_engine, 'writer')
+
+# Fabriques de sessions partagées, construites une seule fois
+async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+read_session = async_sessionmaker(
+    read_engine, class_=AsyncSession, expire_on_commit=False
+)
+write_session = async_sessionmaker(
+    write_engine, class_=AsyncSession, expire_on_commit=False
+)
 
 
 async def init_db():
@@ -13,13 +79,19 @@ async def init_db():
 
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
-        await conn.execute(text('PRAGMA foreign_keys=ON'))  # for SQLite only
 
 
 async def get_session():
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
     async with async_session() as session:
         try:
             yield session
         finally:
             await session.close()
+
+
+async def get_read_session():
+    async with read_session() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
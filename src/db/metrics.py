@@ -0,0 +1,53 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.utils.metrics import registry
+
+db_query_duration_seconds = registry.histogram(
+    'db_query_duration_seconds',
+    'SQL statement execution time by engine and statement type.',
+    ('engine', 'operation'),
+)
+db_query_errors_total = registry.counter(
+    'db_query_errors_total',
+    'SQL statements that raised an error, by engine.',
+    ('engine',),
+)
+
+
+def _operation(statement: str) -> str:
+    # Premier mot du statement : cardinalité bornée (SELECT, INSERT, PRAGMA...)
+    words = statement.split(None, 1)
+    return words[0].upper() if words else 'EMPTY'
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """
+    Time every statement executed through an engine.
+
+    The hooks run in the greenlet that drives the DBAPI cursor, so the
+    measure is the driver round trip (aiosqlite thread included), not the
+    time spent waiting for a pooled connection.
+
+    Args:
+        engine (AsyncEngine): The engine to instrument.
+        name (str): The value of the 'engine' label.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, 'before_cursor_execute')
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_times', []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, 'after_cursor_execute')
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start_times'].pop()
+        db_query_duration_seconds.observe(elapsed, name, _operation(statement))
+
+    @event.listens_for(sync_engine, 'handle_error')
+    def count_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get('query_start_times'):
+            conn.info['query_start_times'].pop()
+        db_query_errors_total.inc(name)
@@ -2,17 +2,39 @@ import uuid
 from datetime import datetime
 
 from fastapi import Depends
-from sqlmodel import Field, ForeignKey
+from sqlalchemy import DDL, Index, event
+from sqlmodel import Field, ForeignKey, SQLModel
+from src.db.fts import USERS_FTS_DDL
 from src.schemes.user import UserBase
 
 
 class User(UserBase, table=True):
     __tablename__ = 'users'
+    # Pagination par keyset sur username lorsque la liste est filtrée par rank
+    __table_args__ = (Index('ix_users_rank_username', 'rank', 'username'),)
 
-    uid: uuid.UUID = Field(default_factory=uuid.uuid4)
+    uid: uuid.UUID = Field(default_factory=uuid.uuid4, index=True, unique=True)
     hashed_password: str
     rank: int = 1020
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(
         default_factory=datetime.now, sa_column_kwargs={'onupdate': datetime.now}
     )
+
+
+# Table FTS5 et triggers créés avec la table users (tests, init_db)
+for statement in USERS_FTS_DDL:
+    event.listen(
+        User.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite')
+    )
+
+
+class RefreshToken(SQLModel, table=True):
+    __tablename__ = 'refresh_tokens'
+
+    jti: str = Field(primary_key=True)
+    user_uid: uuid.UUID = Field(index=True)
+    expires_at: datetime = Field(index=True)
+    used_at: datetime | None = None
+    revoked_at: datetime | None = None
+    created_at: datetime = Field(default_factory=datetime.now)
@@ -0,0 +1,66 @@
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records how long checkouts wait for a connection.
+
+    The wait covers both queueing behind other requests and opening a new
+    connection; a growing average with a pool at full size means requests are
+    queueing. stats() also reports the pool occupancy and overflow.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.peak_checked_out = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            wait = time.perf_counter() - start
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+        self.checkouts += 1
+        self.peak_checked_out = max(self.peak_checked_out, self.checkedout())
+        return connection
+
+    def recreate(self):
+        # Conserve l'instrumentation lorsque SQLAlchemy recrée le pool (dispose)
+        pool = super().recreate()
+        pool.__dict__.update(
+            checkouts=self.checkouts,
+            timeouts=self.timeouts,
+            total_wait=self.total_wait,
+            max_wait=self.max_wait,
+            peak_checked_out=self.peak_checked_out,
+        )
+        return pool
+
+    def stats(self) -> dict:
+        attempts = self.checkouts + self.timeouts
+        return {
+            'size': self.size(),
+            'max_overflow': self._max_overflow,
+            'timeout_seconds': self.timeout(),
+            'checked_out': self.checkedout(),
+            'checked_in': self.checkedin(),
+            'overflow': max(0, self.overflow()),
+            'peak_checked_out': self.peak_checked_out,
+            'checkouts': self.checkouts,
+            'timeouts': self.timeouts,
+            'avg_wait_ms': self.total_wait / attempts * 1000 if attempts else 0.0,
+            'max_wait_ms': self.max_wait * 1000,
+        }
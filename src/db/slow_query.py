@@ -0,0 +1,110 @@
+import logging
+import random
+import re
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.utils.metrics import registry
+from src.utils.request_context import current_route
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+WHITESPACE = re.compile(r'\s+')
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    logger.addHandler(_handler)
+    logger.propagate = False
+
+db_slow_queries_total = registry.counter(
+    'db_slow_queries_total',
+    'SQL statements slower than DB_SLOW_QUERY_MS, by engine.',
+    ('engine',),
+)
+
+
+def normalize_sql(statement: str, max_length: int = 1000) -> str:
+    """
+    Reduce a statement to its shape, without any value.
+
+    Literals become '?', placeholder lists (IN, VALUES) collapse to
+    '(?, ...)' and whitespace is squeezed, so that statements differing only
+    by their values log identically and no data ends up in the logs.
+
+    Args:
+        statement (str): The SQL sent to the driver.
+        max_length (int): Longer statements are truncated.
+
+    Returns:
+        str: The normalized statement.
+    """
+    sql = STRING_LITERAL.sub('?', statement)
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = PLACEHOLDER_LIST.sub('(?, ...)', sql)
+    sql = WHITESPACE.sub(' ', sql).strip()
+    if len(sql) > max_length:
+        sql = sql[:max_length] + '...'
+    return sql
+
+
+class SlowQueryLogger:
+    """
+    Log the statements slower than a threshold, and a sample of the others.
+
+    Replaces echo=True: parameters are never logged, and a statement costs two
+    perf_counter() calls and a comparison unless it is logged. Each line has
+    the normalized SQL, the duration, the row count reported by the driver
+    (unknown for a SELECT on SQLite before its rows are fetched) and the
+    route that issued it.
+    """
+
+    def __init__(self, threshold_ms: float | None, sample_rate: float = 0.0):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f'Query sample rate must be in [0, 1], got {sample_rate}.')
+        self.threshold = threshold_ms / 1000 if threshold_ms is not None else None
+        self.sample_rate = sample_rate
+
+    def attach(self, engine: AsyncEngine, name: str) -> None:
+        sync_engine = engine.sync_engine
+
+        @event.listens_for(sync_engine, 'before_cursor_execute')
+        def start_timer(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('slow_query_start_times', []).append(
+                time.perf_counter()
+            )
+
+        @event.listens_for(sync_engine, 'after_cursor_execute')
+        def stop_timer(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info['slow_query_start_times'].pop()
+            if self.threshold is not None and elapsed >= self.threshold:
+                db_slow_queries_total.inc(name)
+                self._log(
+                    logging.WARNING, 'slow query', name, elapsed, cursor, statement
+                )
+            elif self.sample_rate and random.random() < self.sample_rate:
+                self._log(logging.INFO, 'query', name, elapsed, cursor, statement)
+
+        @event.listens_for(sync_engine, 'handle_error')
+        def drop_timer(exception_context):
+            conn = exception_context.connection
+            if conn is not None and conn.info.get('slow_query_start_times'):
+                conn.info['slow_query_start_times'].pop()
+
+    @staticmethod
+    def _log(level: int, kind: str, name: str, elapsed: float, cursor, statement):
+        rowcount = cursor.rowcount if cursor.rowcount >= 0 else '?'
+        logger.log(
+            level,
+            '%s %.1f ms rows=%s engine=%s route="%s" sql="%s"',
+            kind,
+            elapsed * 1000,
+            rowcount,
+            name,
+            current_route() or '-',
+            normalize_sql(statement),
+        )
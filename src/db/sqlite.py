@@ -0,0 +1,150 @@
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.config import settings
+
+# Profils de PRAGMA appliqués à chaque nouvelle connexion SQLite
+SQLITE_PROFILES = {
+    'performance': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64_000,  # en KiB lorsque négatif : 64 Mo
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+        'foreign_keys': True,
+    },
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -16_000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,
+        'foreign_keys': True,
+    },
+    # Réglages par défaut de SQLite, hormis les clés étrangères
+    'sqlite': {
+        'foreign_keys': True,
+    },
+}
+
+PRAGMA_CHOICES = {
+    'journal_mode': ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'),
+    'synchronous': ('OFF', 'NORMAL', 'FULL', 'EXTRA'),
+    'temp_store': ('DEFAULT', 'FILE', 'MEMORY'),
+}
+PRAGMA_NAMES = (
+    'journal_mode',
+    'synchronous',
+    'cache_size',
+    'mmap_size',
+    'temp_store',
+    'busy_timeout',
+    'foreign_keys',
+)
+
+
+def resolve_sqlite_pragmas(
+    profile: str = settings.SQLITE_PROFILE, overrides: dict | None = None
+) -> dict:
+    """
+    Build the PRAGMA values of a profile, with explicit overrides applied.
+
+    Args:
+        profile (str): One of SQLITE_PROFILES.
+        overrides (dict | None): PRAGMA values replacing the profile ones;
+            None values are ignored. Defaults to the SQLITE_* settings.
+
+    Returns:
+        dict: The validated PRAGMA values, by name.
+    """
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f'Unknown SQLite profile: {profile}')
+    if overrides is None:
+        overrides = {
+            'journal_mode': settings.SQLITE_JOURNAL_MODE,
+            'synchronous': settings.SQLITE_SYNCHRONOUS,
+            'cache_size': settings.SQLITE_CACHE_SIZE,
+            'mmap_size': settings.SQLITE_MMAP_SIZE,
+            'temp_store': settings.SQLITE_TEMP_STORE,
+            'busy_timeout': settings.SQLITE_BUSY_TIMEOUT_MS,
+            'foreign_keys': settings.SQLITE_FOREIGN_KEYS,
+        }
+
+    pragmas = dict(SQLITE_PROFILES[profile])
+    pragmas.update(
+        {name: value for name, value in overrides.items() if value is not None}
+    )
+
+    # Les valeurs sont interpolées dans le PRAGMA : on les valide avant
+    for name, value in pragmas.items():
+        if name in PRAGMA_CHOICES:
+            value = str(value).upper()
+            if value not in PRAGMA_CHOICES[name]:
+                raise ValueError(f'Invalid value for PRAGMA {name}: {value}')
+        elif name == 'foreign_keys':
+            value = 'ON' if value else 'OFF'
+        elif name in PRAGMA_NAMES:
+            value = int(value)
+        else:
+            raise ValueError(f'Unsupported PRAGMA: {name}')
+        pragmas[name] = value
+    return pragmas
+
+
+def apply_sqlite_pragmas(engine: AsyncEngine, pragmas: dict) -> None:
+    if engine.dialect.name != 'sqlite':
+        return
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    event.listen(engine.sync_engine, 'connect', set_pragmas)
+
+
+def use_explicit_transactions(engine: AsyncEngine, begin: str = 'BEGIN') -> None:
+    """
+    Let SQLAlchemy, not the driver, open the SQLite transactions.
+
+    pysqlite (and aiosqlite on top of it) emits no BEGIN before a SAVEPOINT,
+    so the first SAVEPOINT opens the transaction and its RELEASE commits it.
+    With the driver's autocommit handling disabled and an explicit BEGIN
+    sent on every SQLAlchemy begin, SAVEPOINTs nest in one real transaction.
+
+    Args:
+        engine (AsyncEngine): The engine to configure.
+        begin (str): The statement that opens a transaction; 'BEGIN IMMEDIATE'
+            takes the write lock at once instead of on the first write.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    def emit_begin(conn):
+        conn.exec_driver_sql(begin)
+
+    event.listen(engine.sync_engine, 'connect', disable_driver_transactions)
+    event.listen(engine.sync_engine, 'begin', emit_begin)
+
+
+async def read_sqlite_pragmas(engine: AsyncEngine) -> dict:
+    # Valeurs effectives, lues sur une connexion du pool
+    async with engine.connect() as conn:
+        values = {}
+        for name in PRAGMA_NAMES:
+            result = await conn.execute(text(f'PRAGMA {name}'))
+            values[name] = result.scalar()
+
+    for name, choices in PRAGMA_CHOICES.items():
+        # synchronous et temp_store sont renvoyés sous forme d'entier
+        if name != 'journal_mode' and isinstance(values[name], int):
+            values[name] = choices[values[name]]
+    values['foreign_keys'] = 'ON' if values['foreign_keys'] else 'OFF'
+    return values
@@ -0,0 +1,162 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import settings
+from src.db.main import write_session
+from src.utils.request_context import request_scope
+
+T = TypeVar('T')
+WriteUnit = Callable[[AsyncSession], Awaitable[T]]
+# Unité, futur du demandeur et scope de la requête qui l'a soumise
+QueuedUnit = tuple[WriteUnit, asyncio.Future, dict | None]
+
+
+class WriteQueue:
+    """
+    Single writer task that serializes write units of work for SQLite.
+
+    A unit is an async callable receiving the writer session; it must only
+    touch the database (no password hashing or network calls) and must not
+    commit. Units queued together are committed in one transaction (group
+    commit), each inside its own SAVEPOINT: a unit that raises is rolled back
+    alone and its exception is re-raised to its submitter. Each unit runs
+    with the request scope of its submitter, so its statements are logged
+    with the route that queued them.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        max_batch: int = 64,
+        name: str = 'writer',
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.name = name
+        self._queue: asyncio.Queue[QueuedUnit] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+        self.units = 0
+        self.failed_units = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+        self.total_commit_time = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def submit(self, unit: WriteUnit[T]) -> T:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((unit, future, request_scope.get()))
+        return await future
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # Laisse le writer vider la file avant de l'arrêter
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # Group commit : tout ce qui est arrivé pendant le lot précédent
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._commit_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _commit_batch(self, batch: list[QueuedUnit]):
+        start = time.perf_counter()
+        outcomes: list[tuple[asyncio.Future, Any, BaseException | None]] = []
+
+        try:
+            async with self.session_factory() as session:
+                for unit, future, scope in batch:
+                    if future.cancelled():
+                        continue
+                    token = request_scope.set(scope)
+                    try:
+                        async with session.begin_nested():
+                            result = await unit(session)
+                        outcomes.append((future, result, None))
+                    except Exception as exc:
+                        outcomes.append((future, None, exc))
+                    finally:
+                        request_scope.reset(token)
+                await session.commit()
+        except Exception as exc:
+            # Échec du commit : aucune unité du lot n'a été écrite
+            outcomes = [(future, None, exc) for future, _, _ in outcomes]
+
+        for future, result, exc in outcomes:
+            if future.cancelled():
+                continue
+            if exc is None:
+                future.set_result(result)
+            else:
+                self.failed_units += 1
+                future.set_exception(exc)
+
+        self.units += len(outcomes)
+        self.batches += 1
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        self.total_commit_time += time.perf_counter() - start
+
+    def stats(self) -> dict:
+        return {
+            'name': self.name,
+            'running': self.running,
+            'queued': self._queue.qsize(),
+            'units': self.units,
+            'failed_units': self.failed_units,
+            'batches': self.batches,
+            'avg_batch_size': self.units / self.batches if self.batches else 0.0,
+            'max_batch_size': self.max_batch_seen,
+            'avg_batch_ms': (
+                self.total_commit_time / self.batches * 1000 if self.batches else 0.0
+            ),
+        }
+
+
+async def run_write(
+    session: AsyncSession, unit: WriteUnit[T], queue: WriteQueue | None = None
+) -> T:
+    """
+    Run a write unit through the writer task, or inline when it is not started.
+
+    Args:
+        session (AsyncSession): The caller's session, used when the writer is
+            not running (tests, scripts without the app lifespan).
+        unit (WriteUnit): The unit of work; it must not commit.
+        queue (WriteQueue | None): Defaults to the application writer.
+
+    Returns:
+        The value returned by the unit, once committed.
+    """
+    queue = queue or write_queue
+    if queue.running:
+        return await queue.submit(unit)
+
+    try:
+        result = await unit(session)
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    return result
+
+
+write_queue = WriteQueue(write_session, max_batch=settings.DB_WRITE_MAX_BATCH)
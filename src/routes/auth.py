@@ -1,15 +1,23 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.main import get_session
+from src.db.main import get_read_session, get_session
 from src.db.models import User
 from src.schemes.auth import AccessTokenResponse
 from src.schemes.user import UserCreate, UserPublic
-from src.services.auth import AuthService, get_current_user, is_admin, logout
+from src.services.auth import (
+    AuthService,
+    check_login_rate_limit,
+    get_current_user,
+    is_admin,
+)
+from src.services.availability import availability_index
 from src.services.user import UserService
+from src.utils.etag import etag_matches, not_modified, user_etag
 from src.utils.security import decode_refresh_token_from_cookie
+from src.utils.serialization import user_response
 
 router = APIRouter(
     prefix='/auth',
@@ -28,7 +36,29 @@ async def create_user(
     return await UserService(session).create_user(user)
 
 
-@router.post('/login', response_model=AccessTokenResponse)
+@router.get('/available', status_code=status.HTTP_200_OK)
+async def read_availability(
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    username: str | None = None,
+    email: str | None = None,
+):
+    if username is None and email is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Provide a username or an email.',
+        )
+    return await availability_index.check(
+        session,
+        username=username.lower() if username is not None else None,
+        email=email.lower() if email is not None else None,
+    )
+
+
+@router.post(
+    '/login',
+    response_model=AccessTokenResponse,
+    dependencies=[Depends(check_login_rate_limit)],
+)
 async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     session: Annotated[AsyncSession, Depends(get_session)],
@@ -40,9 +70,15 @@ async def login(
 
 @router.get('/me', status_code=status.HTTP_202_ACCEPTED, response_model=UserPublic)
 async def read_user_me(
+    request: Request,
     current_user: Annotated[User, Depends(get_current_user)],
 ):
-    return current_user
+    headers = {'ETag': user_etag(current_user), 'Cache-Control': 'private, no-cache'}
+    if etag_matches(request, headers['ETag']):
+        return not_modified(headers)
+    return user_response(
+        current_user, status_code=status.HTTP_202_ACCEPTED, headers=headers
+    )
 
 
 @router.get('/admin', status_code=status.HTTP_202_ACCEPTED, response_model=UserPublic)
@@ -62,5 +98,7 @@ async def generate_new_access_token(
 
 
 @router.post('/logout')
-def logout_user():
-    return logout()
+async def logout_user(
+    request: Request, session: Annotated[AsyncSession, Depends(get_session)]
+):
+    return await AuthService(session).logout(request)
@@ -0,0 +1,84 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, status
+from src.config import settings
+from src.db.main import engine, read_engine, sqlite_pragmas, write_engine
+from src.db.sqlite import read_sqlite_pragmas
+from src.db.writer import write_queue
+from src.db.models import User
+from src.schemes.auth import Principal
+from src.services.auth import (
+    login_ip_limiter,
+    login_username_limiter,
+    require_admin,
+)
+from src.services.availability import availability_index
+from src.services.user import response_cache, user_cache
+from src.utils.invalidation import invalidation_bus
+from src.utils.security import access_token_cache, hashing_limiter
+
+# Routes de monitoring, réservées aux admins
+router = APIRouter(
+    prefix='/internal',
+    tags=['Internal'],
+)
+
+
+@router.get('/hashing', status_code=status.HTTP_200_OK)
+async def read_hashing_stats(
+    admin: Annotated[Principal | User, Depends(require_admin)],
+):
+    return hashing_limiter.stats()
+
+
+@router.get('/rate-limits', status_code=status.HTTP_200_OK)
+async def read_rate_limit_stats(
+    admin: Annotated[Principal | User, Depends(require_admin)],
+):
+    return [login_ip_limiter.stats(), login_username_limiter.stats()]
+
+
+@router.get('/caches', status_code=status.HTTP_200_OK)
+async def read_cache_stats(admin: Annotated[Principal | User, Depends(require_admin)]):
+    return [
+        access_token_cache.stats(),
+        user_cache.stats(),
+        response_cache.stats(),
+        availability_index.stats(),
+    ]
+
+
+@router.get('/invalidation', status_code=status.HTTP_200_OK)
+async def read_invalidation_stats(
+    admin: Annotated[Principal | User, Depends(require_admin)],
+):
+    return invalidation_bus.stats()
+
+
+@router.get('/db/pool', status_code=status.HTTP_200_OK)
+async def read_db_pool_stats(
+    admin: Annotated[Principal | User, Depends(require_admin)],
+):
+    return {
+        'default': engine.pool.stats(),
+        'read': read_engine.pool.stats(),
+        'writer': write_engine.pool.stats(),
+    }
+
+
+@router.get('/db/writer', status_code=status.HTTP_200_OK)
+async def read_db_writer_stats(
+    admin: Annotated[Principal | User, Depends(require_admin)],
+):
+    return write_queue.stats()
+
+
+@router.get('/db/sqlite', status_code=status.HTTP_200_OK)
+async def read_sqlite_settings(
+    admin: Annotated[Principal | User, Depends(require_admin)],
+):
+    return {
+        'profile': settings.SQLITE_PROFILE,
+        'configured': sqlite_pragmas,
+        'effective': await read_sqlite_pragmas(engine),
+    }
@@ -0,0 +1,74 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from src.db.main import engine, read_engine, write_engine
+from src.db.writer import write_queue
+from src.services.auth import login_ip_limiter, login_username_limiter
+from src.services.availability import availability_index
+from src.services.user import response_cache, user_cache
+from src.utils.invalidation import invalidation_bus
+from src.utils.metrics import registry, stats_gauges
+from src.utils.security import access_token_cache, hashing_limiter
+
+EXPOSITION_MEDIA_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Pas d'authentification (un scraper n'a pas de JWT) : à n'exposer qu'au réseau
+# interne, comme le port d'administration
+router = APIRouter(tags=['Internal'])
+
+
+def _by_name(*stats: dict) -> dict[str, dict]:
+    return {data['name']: data for data in stats}
+
+
+def _collect_stats() -> list[str]:
+    # Les stats() existants, lus au moment du scrape seulement
+    return [
+        *stats_gauges(
+            'app_db_pool',
+            'pool',
+            {
+                'default': engine.pool.stats(),
+                'read': read_engine.pool.stats(),
+                'writer': write_engine.pool.stats(),
+            },
+            'Connection pool stats.',
+        ),
+        *stats_gauges(
+            'app_db_writer', 'queue', {'writer': write_queue.stats()}, 'Writer stats.'
+        ),
+        *stats_gauges(
+            'app_cache',
+            'cache',
+            _by_name(
+                access_token_cache.stats(),
+                user_cache.stats(),
+                response_cache.stats(),
+                availability_index.stats(),
+            ),
+            'In-process cache stats.',
+        ),
+        *stats_gauges(
+            'app_limiter',
+            'limiter',
+            _by_name(
+                hashing_limiter.stats(),
+                login_ip_limiter.stats(),
+                login_username_limiter.stats(),
+            ),
+            'Admission and rate limiter stats.',
+        ),
+        *stats_gauges(
+            'app_invalidation',
+            'backend',
+            {type(invalidation_bus).__name__: invalidation_bus.stats()},
+            'Invalidation bus stats.',
+        ),
+    ]
+
+
+registry.add_collector(_collect_stats)
+
+
+@router.get('/metrics', response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    return PlainTextResponse(registry.render(), media_type=EXPOSITION_MEDIA_TYPE)
@@ -1,12 +1,35 @@
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.main import get_session
+from src.config import settings
+from src.db.main import get_read_session, get_session
 from src.db.models import User
-from src.schemes.user import UserPublic, UserUpdate, UserUpdateAdmin
-from src.services.auth import get_current_user, is_admin
-from src.services.user import UserService
+from src.schemes.auth import Principal
+from src.schemes.user import (
+    UserBatchReport,
+    UserBatchSelector,
+    UserBatchUpdate,
+    UserPublic,
+    UserUpdate,
+    UserUpdateAdmin,
+)
+from src.services.auth import get_current_user, require_admin
+from src.services.user import USERS_LIST_TAG, UserService, response_cache, user_tag
+from src.services.user_import import UserImportService
+from src.utils.etag import etag_matches, not_modified, user_etag, users_etag
+from src.utils.pagination import decode_cursor, next_page_headers
+from src.utils.serialization import (
+    json_response,
+    user_json,
+    user_response,
+    users_json,
+    users_response,
+)
+
+EXPORT_MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
 
 router = APIRouter(
     prefix='/users',
@@ -15,15 +38,153 @@ router = APIRouter(
 
 
 @router.get('/', response_model=list[UserPublic])
-async def read_users(session: Annotated[AsyncSession, Depends(get_session)]):
-    return await UserService(session).get_all_users()
+async def read_users(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    limit: Annotated[
+        int, Query(ge=1, le=settings.USERS_PAGE_MAX_SIZE)
+    ] = settings.USERS_PAGE_SIZE,
+    cursor: str | None = None,
+    rank: int | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+):
+    # Page déjà encodée : ni requête, ni hydratation ORM, ni sérialisation
+    key = response_cache.key(request)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached.response(request)
+    version = response_cache.version
+
+    after = decode_cursor(cursor, username=str)['username'] if cursor else None
+    users, last_username = await UserService(session).list_users(
+        limit=limit,
+        after=after,
+        rank=rank,
+        created_after=created_after,
+        created_before=created_before,
+    )
+
+    position = {'username': last_username} if last_username is not None else None
+    headers = {
+        'ETag': users_etag(users, position),
+        'Cache-Control': 'no-cache',
+        **next_page_headers(request, position),
+    }
+    if etag_matches(request, headers['ETag']):
+        return not_modified(headers)
+
+    body = users_json(users)
+    tags = {USERS_LIST_TAG, *(user_tag(user.username) for user in users)}
+    response_cache.set(key, body, headers, tags, version)
+    return json_response(body, headers=headers)
+
+
+@router.get('/search', response_model=list[UserPublic])
+async def search_users(
+    request: Request,
+    q: str,
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    admin: Annotated[Principal | User, Depends(require_admin)],
+    limit: Annotated[
+        int, Query(ge=1, le=settings.USERS_PAGE_MAX_SIZE)
+    ] = settings.USERS_PAGE_SIZE,
+    cursor: str | None = None,
+):
+    offset = decode_cursor(cursor, offset=int)['offset'] if cursor else 0
+    users, next_offset = await UserService(session).search_users(
+        q, limit=limit, offset=offset
+    )
+
+    position = {'offset': next_offset} if next_offset is not None else None
+    headers = {
+        'ETag': users_etag(users, position),
+        'Cache-Control': 'private, no-cache',
+        **next_page_headers(request, position),
+    }
+    if etag_matches(request, headers['ETag']):
+        return not_modified(headers)
+    return users_response(users, headers=headers)
+
+
+@router.get('/export', status_code=status.HTTP_200_OK)
+async def export_users(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    admin: Annotated[Principal | User, Depends(require_admin)],
+    export_format: Annotated[
+        Literal['ndjson', 'csv'], Query(alias='format')
+    ] = 'ndjson',
+):
+    # Déclarée avant /{username} ; la session est refermée par le générateur
+    media_type = EXPORT_MEDIA_TYPES[export_format]
+    return StreamingResponse(
+        UserService(session).export_users(export_format, request.is_disconnected),
+        media_type=media_type,
+        headers={
+            'Content-Disposition': f'attachment; filename="users.{export_format}"'
+        },
+    )
+
+
+@router.post('/import', status_code=status.HTTP_200_OK)
+async def import_users(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(get_session)],
+    admin: Annotated[Principal | User, Depends(require_admin)],
+    import_format: Annotated[
+        Literal['ndjson', 'csv'], Query(alias='format')
+    ] = 'ndjson',
+):
+    # Le corps est lu en streaming, ligne par ligne
+    return await UserImportService(session).import_users(
+        request.stream(), import_format
+    )
+
+
+@router.post(
+    '/batch/update', status_code=status.HTTP_200_OK, response_model=UserBatchReport
+)
+async def batch_update_users(
+    batch: UserBatchUpdate,
+    session: Annotated[AsyncSession, Depends(get_session)],
+    admin: Annotated[Principal | User, Depends(require_admin)],
+):
+    return await UserService(session).batch_update_rank(batch.where, batch.rank)
+
+
+@router.post(
+    '/batch/delete', status_code=status.HTTP_200_OK, response_model=UserBatchReport
+)
+async def batch_delete_users(
+    selector: UserBatchSelector,
+    session: Annotated[AsyncSession, Depends(get_session)],
+    admin: Annotated[Principal | User, Depends(require_admin)],
+):
+    return await UserService(session).batch_delete(selector)
 
 
 @router.get('/{username}', status_code=status.HTTP_200_OK, response_model=UserPublic)
 async def read_user(
-    username: str, session: Annotated[AsyncSession, Depends(get_session)]
+    username: str,
+    request: Request,
+    session: Annotated[AsyncSession, Depends(get_read_session)],
 ):
-    return await UserService(session).get_user(username)
+    key = response_cache.key(request)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached.response(request)
+    version = response_cache.version
+
+    user = await UserService(session).get_user(username)
+    # 304 avant toute sérialisation : le client a déjà cette version
+    headers = {'ETag': user_etag(user), 'Cache-Control': 'no-cache'}
+    if etag_matches(request, headers['ETag']):
+        return not_modified(headers)
+
+    body = user_json(user)
+    response_cache.set(key, body, headers, {user_tag(user.username)}, version)
+    return json_response(body, headers=headers)
 
 
 @router.patch('/', response_model=UserPublic)
@@ -33,7 +194,8 @@ async def update_user(
     current_user: Annotated[User, Depends(get_current_user)],
 ):
     username = current_user.username
-    return await UserService(session).update_user(username, user)
+    db_user = await UserService(session).update_user(username, user)
+    return user_response(db_user, headers={'ETag': user_etag(db_user)})
 
 
 @router.patch('/{username}', response_model=UserPublic)
@@ -41,9 +203,10 @@ async def update_user_admin(
     username: str,
     user: UserUpdateAdmin,
     session: Annotated[AsyncSession, Depends(get_session)],
-    admin: Annotated[User, Depends(is_admin)],
+    admin: Annotated[Principal | User, Depends(require_admin)],
 ):
-    return await UserService(session).update_user_admin(username, user)
+    db_user = await UserService(session).update_user_admin(username, user)
+    return user_response(db_user, headers={'ETag': user_etag(db_user)})
 
 
 @router.delete('/', status_code=status.HTTP_200_OK)
@@ -61,7 +224,7 @@ async def delete_user(
 async def delete_user_admin(
     username: str,
     session: Annotated[AsyncSession, Depends(get_session)],
-    admin: Annotated[User, Depends(is_admin)],
+    admin: Annotated[Principal | User, Depends(require_admin)],
 ):
     await UserService(session).delete_user(username)
     return {'detail': f'User {username} deleted successfully.'}
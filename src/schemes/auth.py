@@ -1,3 +1,5 @@
+import uuid
+
 from sqlmodel import SQLModel
 
 
@@ -8,3 +10,9 @@ class TokenBase(SQLModel):
 
 class AccessTokenResponse(TokenBase):
     pass
+
+
+class Principal(SQLModel):
+    uid: uuid.UUID
+    username: str
+    rank: int
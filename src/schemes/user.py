@@ -30,6 +30,27 @@ class UserUpdate(UserUpdateAdmin):
     old_password: str | None = None
 
 
+class UserBatchSelector(SQLModel):
+    usernames: list[str] | None = Field(default=None, max_length=1000)
+    rank: int | None = None
+    created_before: datetime | None = None
+
+
+class UserBatchUpdate(SQLModel):
+    where: UserBatchSelector
+    rank: int
+
+
+class UserBatchResult(SQLModel):
+    username: str
+    status: str
+
+
+class UserBatchReport(SQLModel):
+    matched: int
+    results: list[UserBatchResult]
+
+
 class UserLogin(UserBase):
     email: None = None
     password: str
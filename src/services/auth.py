@@ -2,27 +2,51 @@ import uuid
 from datetime import timedelta
 from typing import Annotated
 
-import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jwt import ExpiredSignatureError, InvalidTokenError
-from sqlmodel import select
+from sqlmodel import update
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.config import settings
 from src.db.main import get_session
 from src.db.models import User
-from src.schemes.auth import AccessTokenResponse
+from src.db.writer import run_write
+from src.schemes.auth import AccessTokenResponse, Principal
+from src.services.refresh_token import RefreshTokenService
+from src.services.user import UserService, publish_user_changed
+from src.utils.ratelimit import TokenBucketLimiter, retry_after_header
 from src.utils.security import (
     create_access_token,
-    create_refresh_token,
-    verify_password,
+    decode_access_token,
+    decode_refresh_token_from_cookie,
+    hash_password_async,
+    password_needs_rehash,
+    verify_password_async,
 )
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/auth/login')
 at_expire_seconds = 60 * settings.JWT_ACCESS_EXPIRATION_IN_MIN
 rt_expire_in_seconds = 24 * 60 * 60 * settings.JWT_REFRESH_EXPIRATION_IN_HOURS
 
+login_ip_limiter = TokenBucketLimiter(
+    capacity=settings.LOGIN_RATE_IP_BURST,
+    refill_per_second=settings.LOGIN_RATE_IP_PER_MINUTE / 60,
+    max_keys=settings.LOGIN_RATE_MAX_KEYS,
+    name='login_ip',
+)
+login_username_limiter = TokenBucketLimiter(
+    capacity=settings.LOGIN_RATE_USERNAME_BURST,
+    refill_per_second=settings.LOGIN_RATE_USERNAME_PER_MINUTE / 60,
+    max_keys=settings.LOGIN_RATE_MAX_KEYS,
+    name='login_username',
+)
+
+
+def build_access_claims(user: User) -> dict:
+    # Claims suffisants pour autoriser une requête sans relire la DB (mode stateless)
+    return {'sub': str(user.uid), 'rank': user.rank, 'username': user.username}
+
 
 class AuthService:
     def __init__(self, session: AsyncSession):
@@ -31,7 +55,7 @@ class AuthService:
     async def login(self, form_data: OAuth2PasswordRequestForm):
         user_db = await self.session.get(User, form_data.username.lower())
 
-        if not user_db or not verify_password(
+        if not user_db or not await verify_password_async(
             form_data.password, user_db.hashed_password
         ):
             raise HTTPException(
@@ -39,14 +63,31 @@ class AuthService:
                 detail='Invalid username or password.',
             )
 
+        # Rehash transparent si le coût bcrypt a changé depuis le dernier hachage
+        new_hash = None
+        if password_needs_rehash(user_db.hashed_password):
+            new_hash = await hash_password_async(form_data.password)
+
+        # Hachage fait avant : l'unité d'écriture ne touche que la DB
+        async def record_login(session: AsyncSession) -> str:
+            if new_hash is not None:
+                await session.exec(
+                    update(User)
+                    .where(User.username == user_db.username)
+                    .values(hashed_password=new_hash)
+                )
+            return await RefreshTokenService(session).issue(
+                user_db, expires_delta=timedelta(seconds=rt_expire_in_seconds)
+            )
+
+        refresh_token = await run_write(self.session, record_login)
+        if new_hash is not None:
+            await publish_user_changed(user_db.uid, user_db.username)
+
         access_token = create_access_token(
-            data={'sub': str(user_db.uid), 'rank': user_db.rank},
+            data=build_access_claims(user_db),
             expires_delta=timedelta(seconds=at_expire_seconds),
         )
-        refresh_token = create_refresh_token(
-            data={'sub': str(user_db.uid), 'rank': user_db.rank},
-            expires_delta=timedelta(seconds=rt_expire_in_seconds),
-        )
 
         response = JSONResponse(
             content={
@@ -55,27 +96,18 @@ class AuthService:
             },
             status_code=status.HTTP_202_ACCEPTED,
         )
-
-        response.set_cookie(
-            key='refreshToken',
-            value=refresh_token,
-            httponly=True,
-            secure=True,
-            # samesite='Strict',
-            samesite='None',
-            max_age=rt_expire_in_seconds,
-            path='/auth/refresh',
-        )
+        set_refresh_token_cookie(response, refresh_token)
 
         return response
 
     async def refresh_access_token(self, refresh_payload):
         user_uid = refresh_payload.get('sub')
+        refresh_tokens = RefreshTokenService(self.session)
 
-        results = await self.session.exec(
-            select(User).where(User.uid == uuid.UUID(user_uid))
-        )
-        user_db = results.first()
+        if await refresh_tokens.is_revoked(refresh_payload['jti']):
+            await self._reject_reused_refresh_token(refresh_tokens, user_uid)
+
+        user_db = await UserService(self.session).get_user_by_uid(uuid.UUID(user_uid))
 
         if not user_db:
             raise HTTPException(
@@ -83,21 +115,104 @@ class AuthService:
                 detail='Refresh token user ID not found.',
             )
 
+        # Claims reconstruits depuis la DB : rank et username restent à jour
         access_token = create_access_token(
-            data={'sub': user_uid}, expires_delta=timedelta(seconds=at_expire_seconds)
+            data=build_access_claims(user_db),
+            expires_delta=timedelta(seconds=at_expire_seconds),
+        )
+
+        # Rotation : l'ancien refresh token est consommé, un nouveau est émis
+        async def rotate(session: AsyncSession) -> str | None:
+            writer_tokens = RefreshTokenService(session)
+            if not await writer_tokens.consume(refresh_payload):
+                return None
+            return await writer_tokens.issue(
+                user_db, expires_delta=timedelta(seconds=rt_expire_in_seconds)
+            )
+
+        refresh_token = await run_write(self.session, rotate)
+        if refresh_token is None:
+            await self._reject_reused_refresh_token(refresh_tokens, user_uid)
+
+        response = JSONResponse(
+            content=AccessTokenResponse(access_token=access_token).model_dump()
+        )
+        set_refresh_token_cookie(response, refresh_token)
+
+        return response
+
+    async def _reject_reused_refresh_token(
+        self, refresh_tokens: RefreshTokenService, user_uid: str
+    ):
+        # Un token déjà utilisé qui revient est probablement volé
+        async def revoke_family(session: AsyncSession):
+            await RefreshTokenService(session).revoke_all_for_user(uuid.UUID(user_uid))
+
+        await run_write(self.session, revoke_family)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Refresh token revoked. Please login.',
+        )
+
+    async def logout(self, request: Request):
+        response = JSONResponse(content={'detail': 'Logged out successfully.'})
+
+        # Le refresh token présenté est révoqué, s'il est encore valide
+        try:
+            refresh_payload = decode_refresh_token_from_cookie(request)
+        except HTTPException:
+            refresh_payload = None
+        if refresh_payload:
+
+            async def revoke(session: AsyncSession):
+                await RefreshTokenService(session).revoke(refresh_payload)
+
+            await run_write(self.session, revoke)
+
+        # Demande au client de supprimer le cookie !!! MEMES PARAMETRES QUE LORS DE LA CREATION !!!
+        response.delete_cookie(
+            key='refreshToken',
+            path=REFRESH_COOKIE_PATH,
+            secure=True,
+            samesite='None',
         )
+        return response
+
 
-        return AccessTokenResponse(access_token=access_token)
+# Couvre /auth/refresh et /auth/logout, qui doit recevoir le cookie pour le révoquer
+REFRESH_COOKIE_PATH = '/auth'
 
 
-def logout():
-    response = JSONResponse(content={'detail': 'Logged out successfully.'})
+def set_refresh_token_cookie(response: JSONResponse, refresh_token: str):
+    response.set_cookie(
+        key='refreshToken',
+        value=refresh_token,
+        httponly=True,
+        secure=True,
+        # samesite='Strict',
+        samesite='None',
+        max_age=rt_expire_in_seconds,
+        path=REFRESH_COOKIE_PATH,
+    )
+
 
-    # Demande au client de supprimer le cookie !!! MEMES PARAMETRES QUE LORS DE LA CREATION !!!
-    response.delete_cookie(
-        key='refreshToken', path='/auth/refresh', secure=True, samesite='None'
+# Dépendance de la route de login : rejette avant toute requête DB ou hachage
+def check_login_rate_limit(
+    request: Request,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+):
+    client_ip = request.client.host if request.client else 'unknown'
+    retry_after = max(
+        login_ip_limiter.consume(client_ip),
+        login_username_limiter.consume(form_data.username.lower()),
     )
-    return response
+
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail='Too many login attempts, please retry later.',
+            headers=retry_after_header(retry_after),
+        )
 
 
 # Dépendance utilisée dans les routes protégées
@@ -112,9 +227,7 @@ async def get_current_user(
     )
 
     try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = decode_access_token(token)
 
         # Transforme le token type str en type UUID
         user_uid = uuid.UUID(payload.get('sub'))
@@ -122,9 +235,7 @@ async def get_current_user(
         if user_uid is None:
             raise invalid_token_exception
 
-        statement = select(User).where(User.uid == user_uid)
-        result = await session.exec(statement)
-        user_db = result.first()
+        user_db = await UserService(session).get_user_by_uid(user_uid)
 
         if not user_db:
             raise invalid_token_exception
@@ -153,9 +264,7 @@ async def is_admin(
     )
 
     try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = decode_access_token(token)
 
         # Transforme le token type str en type UUID
         user_uid = uuid.UUID(payload.get('sub'))
@@ -163,9 +272,7 @@ async def is_admin(
         if user_uid is None:
             raise invalid_token_exception
 
-        statement = select(User).where(User.uid == user_uid)
-        result = await session.exec(statement)
-        user_db = result.first()
+        user_db = await UserService(session).get_user_by_uid(user_uid)
 
         if not user_db:
             raise invalid_token_exception
@@ -185,3 +292,48 @@ async def is_admin(
         )
     except InvalidTokenError:
         raise invalid_token_exception
+
+
+# Dépendance sans requête DB en mode stateless : le principal vient des claims du token
+async def get_current_principal(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> Principal | User:
+    if not settings.AUTH_STATELESS:
+        return await get_current_user(token, session)
+
+    invalid_token_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail='Invalid token.',
+        headers={'WWW-Authenticate': 'Bearer'},
+    )
+
+    try:
+        payload = decode_access_token(token)
+
+        return Principal(
+            uid=uuid.UUID(payload['sub']),
+            username=payload['username'],
+            rank=payload['rank'],
+        )
+
+    except ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Token expired.',
+            headers={'WWW-Authenticate': 'Bearer'},
+        )
+    except (InvalidTokenError, KeyError, TypeError, ValueError):
+        raise invalid_token_exception
+
+
+# Dépendance admin qui n'a besoin que du rank
+async def require_admin(
+    principal: Annotated[Principal | User, Depends(get_current_principal)],
+) -> Principal | User:
+    if principal.rank != 1337:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Requires admin privilege.',
+        )
+    return principal
@@ -0,0 +1,132 @@
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import settings
+from src.db.models import User
+from src.utils.bloom import BloomFilter
+from src.utils.dbcheck import find_existing_users
+from src.utils.invalidation import invalidation_bus
+
+USERS_TAKEN = 'users_taken'
+
+
+class AvailabilityIndex:
+    """
+    Bloom filters of the usernames and emails already taken.
+
+    A value absent from its filter is certainly free and is answered without
+    touching the database; a positive answer may be a false positive (or a
+    deleted account) and is confirmed with a query. Until load() has run,
+    every check goes to the database.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.usernames = BloomFilter(capacity, error_rate)
+        self.emails = BloomFilter(capacity, error_rate)
+        self.ready = False
+
+        self.checks = 0
+        self.filter_answers = 0
+        self.db_checks = 0
+
+    def add(self, usernames: list[str] = (), emails: list[str] = ()) -> None:
+        for username in usernames:
+            self.usernames.add(username)
+        for email in emails:
+            self.emails.add(email)
+
+    async def load(
+        self, session: AsyncSession, batch_size: int = settings.USERS_EXPORT_BATCH
+    ) -> int:
+        self.usernames.clear()
+        self.emails.clear()
+
+        loaded = 0
+        result = await session.stream(
+            select(User.username, User.email).execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            self.add([row.username for row in rows], [row.email for row in rows])
+            loaded += len(rows)
+
+        self.ready = True
+        return loaded
+
+    async def check(
+        self,
+        session: AsyncSession,
+        username: str | None = None,
+        email: str | None = None,
+    ) -> dict[str, bool]:
+        """
+        Tell whether a username and/or an email are still available.
+
+        Args:
+            session (AsyncSession): Used only when a filter answers "maybe".
+            username (str | None): The username to check, lowercased.
+            email (str | None): The email to check, lowercased.
+
+        Returns:
+            dict[str, bool]: Availability of each value that was given.
+        """
+        self.checks += 1
+        availability = {}
+        usernames, emails = set(), set()
+
+        if username is not None:
+            if self.ready and username not in self.usernames:
+                availability['username'] = True
+            else:
+                usernames.add(username)
+        if email is not None:
+            if self.ready and email not in self.emails:
+                availability['email'] = True
+            else:
+                emails.add(email)
+
+        if not (usernames or emails):
+            self.filter_answers += 1
+            return availability
+
+        self.db_checks += 1
+        taken_usernames, taken_emails = await find_existing_users(
+            session, usernames, emails
+        )
+        if usernames:
+            availability['username'] = username not in taken_usernames
+        if emails:
+            availability['email'] = email not in taken_emails
+        return availability
+
+    def clear(self) -> None:
+        self.usernames.clear()
+        self.emails.clear()
+        self.ready = False
+
+    def stats(self) -> dict:
+        return {
+            'name': 'availability',
+            'ready': self.ready,
+            'checks': self.checks,
+            'filter_answers': self.filter_answers,
+            'db_checks': self.db_checks,
+            'usernames': self.usernames.stats(),
+            'emails': self.emails.stats(),
+        }
+
+
+availability_index = AvailabilityIndex(capacity=settings.AVAILABILITY_BLOOM_CAPACITY)
+
+
+def _add_taken(payload: dict) -> None:
+    availability_index.add(payload['usernames'], payload['emails'])
+
+
+invalidation_bus.subscribe(USERS_TAKEN, _add_taken)
+
+
+async def publish_users_taken(usernames: list[str], emails: list[str]) -> None:
+    # Appliqué localement puis diffusé : les filtres des autres workers suivent
+    if usernames or emails:
+        await invalidation_bus.publish(
+            USERS_TAKEN, {'usernames': usernames, 'emails': emails}
+        )
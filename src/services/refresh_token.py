@@ -0,0 +1,171 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from sqlmodel import delete, or_, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import settings
+from src.db.main import async_session
+from src.db.models import RefreshToken, User
+from src.db.writer import run_write
+from src.utils.invalidation import invalidation_bus
+from src.utils.security import create_refresh_token, revoked_refresh_jtis
+
+REFRESH_REVOKED = 'refresh_revoked'
+
+
+def _add_revoked_jtis(payload: dict) -> None:
+    for jti in payload['jtis']:
+        revoked_refresh_jtis.add(jti)
+
+
+invalidation_bus.subscribe(REFRESH_REVOKED, _add_revoked_jtis)
+
+
+class RefreshTokenService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def issue(self, user: User, expires_delta: timedelta) -> str:
+        # Le commit est laissé à l'appelant
+        jti = uuid.uuid4().hex
+        refresh_token = create_refresh_token(
+            data={'sub': str(user.uid), 'rank': user.rank, 'jti': jti},
+            expires_delta=expires_delta,
+        )
+        self.session.add(
+            RefreshToken(
+                jti=jti, user_uid=user.uid, expires_at=datetime.now() + expires_delta
+            )
+        )
+        return refresh_token
+
+    async def is_revoked(self, jti: str) -> bool:
+        # Cas courant : absent du filtre de Bloom, donc jamais utilisé ni révoqué
+        if jti not in revoked_refresh_jtis:
+            return False
+
+        token_db = await self.session.get(RefreshToken, jti)
+        return bool(token_db and (token_db.used_at or token_db.revoked_at))
+
+    async def consume(self, refresh_payload: dict) -> bool:
+        """
+        Mark a refresh token as used, so that it cannot be rotated twice.
+
+        Args:
+            refresh_payload (dict): The decoded refresh token.
+
+        Returns:
+            bool: False if the token was already used, revoked or never issued.
+        """
+        jti = refresh_payload['jti']
+        result = await self.session.exec(
+            update(RefreshToken)
+            .where(
+                RefreshToken.jti == jti,
+                RefreshToken.used_at.is_(None),
+                RefreshToken.revoked_at.is_(None),
+            )
+            .values(used_at=datetime.now())
+        )
+
+        # Déjà utilisé, révoqué ou jamais émis (jti inconnu) : refusé
+        if result.rowcount == 0:
+            return False
+
+        await invalidation_bus.publish(REFRESH_REVOKED, {'jtis': [jti]})
+        return True
+
+    async def revoke(self, refresh_payload: dict) -> None:
+        jti = refresh_payload['jti']
+        result = await self.session.exec(
+            update(RefreshToken)
+            .where(RefreshToken.jti == jti, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.now())
+        )
+
+        if result.rowcount == 0 and not await self.session.get(RefreshToken, jti):
+            self.session.add(
+                RefreshToken(
+                    jti=jti,
+                    user_uid=uuid.UUID(refresh_payload['sub']),
+                    expires_at=datetime.fromtimestamp(refresh_payload['exp']),
+                    revoked_at=datetime.now(),
+                )
+            )
+
+        await invalidation_bus.publish(REFRESH_REVOKED, {'jtis': [jti]})
+
+    async def revoke_all_for_user(self, user_uid: uuid.UUID) -> None:
+        # Réutilisation d'un token déjà consommé : toute la famille est révoquée
+        result = await self.session.exec(
+            update(RefreshToken)
+            .where(RefreshToken.user_uid == user_uid, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.now())
+            .returning(RefreshToken.jti)
+        )
+        await invalidation_bus.publish(
+            REFRESH_REVOKED, {'jtis': list(result.scalars())}
+        )
+
+
+async def load_revoked_refresh_tokens(session: AsyncSession) -> int:
+    """
+    Rebuild the Bloom filter from the unexpired used or revoked tokens.
+
+    Args:
+        session (AsyncSession): The database session.
+
+    Returns:
+        int: The number of jti loaded in the filter.
+    """
+    results = await session.exec(
+        select(RefreshToken.jti).where(
+            RefreshToken.expires_at > datetime.now(),
+            or_(
+                RefreshToken.used_at.is_not(None), RefreshToken.revoked_at.is_not(None)
+            ),
+        )
+    )
+    jtis = results.all()
+
+    revoked_refresh_jtis.clear()
+    for jti in jtis:
+        revoked_refresh_jtis.add(jti)
+    return len(jtis)
+
+
+async def prune_expired_refresh_tokens(
+    session: AsyncSession, batch_size: int = settings.REFRESH_TOKEN_PRUNE_BATCH
+) -> int:
+    # Un lot par unité du writer : les autres écritures passent entre deux lots
+    async def delete_batch(session: AsyncSession) -> int:
+        expired = select(RefreshToken.jti).where(
+            RefreshToken.expires_at <= datetime.now()
+        )
+        result = await session.exec(
+            delete(RefreshToken).where(RefreshToken.jti.in_(expired.limit(batch_size)))
+        )
+        return result.rowcount
+
+    pruned = 0
+    while True:
+        deleted = await run_write(session, delete_batch)
+        pruned += deleted
+        if deleted < batch_size:
+            return pruned
+
+
+async def prune_refresh_tokens_periodically(
+    interval_seconds: int = settings.REFRESH_TOKEN_PRUNE_INTERVAL_SECONDS,
+):
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            async with async_session() as session:
+                pruned = await prune_expired_refresh_tokens(session)
+                # Les jti expirés sortent aussi du filtre de Bloom
+                await load_revoked_refresh_tokens(session)
+            print(f'🧹 {pruned} refresh token(s) expiré(s) supprimé(s).')
+        except Exception as exc:
+            print('❌ Purge des refresh tokens échouée :', exc)
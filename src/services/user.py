@@ -1,53 +1,272 @@
+import csv
+import io
+import re
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import datetime
+
 from fastapi import HTTPException, status
-from sqlmodel import or_, select
+from sqlalchemy import column, table, text
+from sqlmodel import delete, select, update
 from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import settings
+from src.db.fts import USERS_FTS_KEYS_TABLE, USERS_FTS_TABLE
 from src.db.models import User
-from src.schemes.user import UserUpdate
+from src.db.writer import run_write
+from src.schemes.user import (
+    UserBatchReport,
+    UserBatchResult,
+    UserBatchSelector,
+    UserPublic,
+    UserUpdate,
+)
+from src.services.availability import USERS_TAKEN, publish_users_taken
 from src.utils.dbcheck import (
     check_username_or_email_exists,
 )
-from src.utils.security import hash_password, verify_password
+from src.utils.invalidation import invalidation_bus
+from src.utils.response_cache import ResponseCache
+from src.utils.security import hash_password_async, verify_password_async
+from src.utils.user_cache import UserCache
+
+USER_CHANGED = 'user_changed'
+USERS_CHANGED = 'users_changed'
+
+# Cache lecture seule des utilisateurs, invalidé par les écritures de UserService
+user_cache = UserCache(
+    maxsize=settings.USER_CACHE_SIZE, ttl_seconds=settings.USER_CACHE_TTL_SECONDS
+)
+
+# Réponses encodées des routes publiques, étiquetées par username
+# ('user:<username>') et 'users' pour toutes les pages de liste
+response_cache = ResponseCache(
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
+USERS_LIST_TAG = 'users'
+
+
+def user_tag(username: str) -> str:
+    return f'user:{username}'
+
+
+def _invalidate_cached_user(payload: dict) -> None:
+    user_cache.invalidate(uid=uuid.UUID(payload['uid']))
+    for username in payload['usernames']:
+        user_cache.invalidate(username=username)
+    # Seules les pages qui contiennent l'utilisateur changent
+    response_cache.invalidate_tags([user_tag(name) for name in payload['usernames']])
+
+
+def _invalidate_cached_users(payload: dict) -> None:
+    for uid in payload['uids']:
+        user_cache.invalidate(uid=uuid.UUID(uid))
+    for username in payload['usernames']:
+        user_cache.invalidate(username=username)
+    # Un changement de rank peut faire entrer un utilisateur dans une liste filtrée
+    response_cache.invalidate_tags(
+        [USERS_LIST_TAG, *(user_tag(name) for name in payload['usernames'])]
+    )
+
+
+def _invalidate_cached_lists(payload: dict) -> None:
+    # Un nouveau username peut s'insérer dans n'importe quelle page
+    response_cache.invalidate_tags([USERS_LIST_TAG])
+
+
+invalidation_bus.subscribe(USER_CHANGED, _invalidate_cached_user)
+invalidation_bus.subscribe(USERS_CHANGED, _invalidate_cached_users)
+invalidation_bus.subscribe(USERS_TAKEN, _invalidate_cached_lists)
+
+
+async def publish_user_changed(uid: uuid.UUID, *usernames: str) -> None:
+    # Appliqué localement puis diffusé aux autres workers
+    await invalidation_bus.publish(
+        USER_CHANGED, {'uid': str(uid), 'usernames': list(usernames)}
+    )
+
+
+async def publish_users_changed(users: list[tuple[uuid.UUID, str]]) -> None:
+    # Un seul événement pour toute une opération par lot
+    if users:
+        await invalidation_bus.publish(
+            USERS_CHANGED,
+            {
+                'uids': [str(uid) for uid, _ in users],
+                'usernames': [username for _, username in users],
+            },
+        )
 
 
 class UserService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_all_users(self):
+    async def list_users(
+        self,
+        limit: int,
+        after: str | None = None,
+        rank: int | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+    ) -> tuple[list[User], str | None]:
+        """
+        Return one page of users ordered by username (keyset pagination).
+
+        Args:
+            limit (int): The page size.
+            after (str | None): The last username of the previous page.
+            rank (int | None): Only return users of this rank.
+            created_after (datetime | None): Lower bound on created_at (inclusive).
+            created_before (datetime | None): Upper bound on created_at (exclusive).
+
+        Returns:
+            tuple[list[User], str | None]: The page, and the username to resume
+                after, or None on the last page.
+        """
         statement = select(User)
-        result = await self.session.exec(statement)
-        return result.all()
+        if after is not None:
+            statement = statement.where(User.username > after)
+        if rank is not None:
+            statement = statement.where(User.rank == rank)
+        if created_after is not None:
+            statement = statement.where(User.created_at >= created_after)
+        if created_before is not None:
+            statement = statement.where(User.created_at < created_before)
+
+        # Une ligne de plus pour savoir s'il existe une page suivante
+        result = await self.session.exec(
+            statement.order_by(User.username).limit(limit + 1)
+        )
+        users = list(result.all())
+        if len(users) > limit:
+            users = users[:limit]
+            return users, users[-1].username
+        return users, None
 
     async def create_user(self, user):
         username_lower = user.username.lower()
         email_lower = user.email.lower()
-        user_check = await check_username_or_email_exists(
-            username=username_lower, email=email_lower, session=self.session
+        # Vérification anticipée : évite un hachage bcrypt inutile
+        await ensure_username_and_email_available(
+            self.session, username_lower, email_lower
         )
-        if user_check:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=user_check,
-            )
 
-        hashed_password = hash_password(user.password)
+        hashed_password = await hash_password_async(user.password)
         extra_data = {
             'hashed_password': hashed_password,
             'username': username_lower,
             'email': email_lower,
+            'rank': initial_rank(username_lower),
         }
-        if username_lower == 'fkaisin':
-            extra_data['rank'] = 1337
         db_user = User.model_validate(user, update=extra_data)
-        self.session.add(db_user)
-        await self.session.commit()
-        await self.session.refresh(db_user)
+
+        async def insert_user(session: AsyncSession) -> User:
+            # Revérifié par le writer : deux inscriptions concurrentes sont sérialisées
+            await ensure_username_and_email_available(
+                session, username_lower, email_lower
+            )
+            session.add(db_user)
+            return db_user
+
+        db_user = await run_write(self.session, insert_user)
+        await publish_users_taken([db_user.username], [db_user.email])
         return db_user
 
+    async def search_users(
+        self, query: str, limit: int, offset: int = 0
+    ) -> tuple[list[User], int | None]:
+        """
+        Full-text prefix search on usernames and emails, best matches first.
+
+        Args:
+            query (str): Free text; every word is matched as a prefix.
+            limit (int): The page size.
+            offset (int): The number of results to skip.
+
+        Returns:
+            tuple[list[User], int | None]: The page, and the offset of the
+                next page, or None on the last page.
+        """
+        terms = [term for term in re.findall(r'\w+', query.lower()) if len(term) >= 2]
+        if not terms:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Search query must contain a word of at least 2 characters.',
+            )
+        # Chaque mot entre guillemets : aucune syntaxe FTS5 venant du client
+        fts_query = ' '.join(f'"{term}"*' for term in terms)
+
+        users_fts = table(USERS_FTS_TABLE, column('rowid'), column('rank'))
+        fts_keys = table(USERS_FTS_KEYS_TABLE, column('id'), column('username'))
+        statement = (
+            select(User)
+            .join(fts_keys, fts_keys.c.username == User.username)
+            .join(users_fts, users_fts.c.rowid == fts_keys.c.id)
+            .where(text(f'{USERS_FTS_TABLE} MATCH :query').bindparams(query=fts_query))
+            .order_by(users_fts.c.rank, User.username)
+            .limit(limit + 1)
+            .offset(offset)
+        )
+        result = await self.session.exec(statement)
+        users = list(result.all())
+        if len(users) > limit:
+            return users[:limit], offset + limit
+        return users, None
+
+    async def export_users(
+        self,
+        export_format: str,
+        is_disconnected: Callable[[], Awaitable[bool]],
+        batch_size: int = settings.USERS_EXPORT_BATCH,
+    ) -> AsyncIterator[str]:
+        """
+        Stream every user as NDJSON or CSV, one chunk per batch of rows.
+
+        Rows come from a server-side cursor, so memory stays constant whatever
+        the table size. The session is closed once the export ends, including
+        when the client disconnects.
+
+        Args:
+            export_format (str): 'ndjson' or 'csv'.
+            is_disconnected: Coroutine telling whether the client is gone.
+            batch_size (int): The number of rows fetched and sent per chunk.
+        """
+        fields = list(UserPublic.model_fields)
+        try:
+            if export_format == 'csv':
+                yield ','.join(fields) + '\r\n'
+
+            result = await self.session.stream_scalars(
+                select(User)
+                .order_by(User.username)
+                .execution_options(yield_per=batch_size)
+            )
+            async for users in result.partitions():
+                if await is_disconnected():
+                    break
+                rows = [UserPublic.model_validate(user) for user in users]
+                if export_format == 'csv':
+                    # Mêmes formats de dates et d'uid que l'export NDJSON
+                    buffer = io.StringIO()
+                    csv.writer(buffer).writerows(
+                        row.model_dump(mode='json').values() for row in rows
+                    )
+                    yield buffer.getvalue()
+                else:
+                    yield ''.join(row.model_dump_json() + '\n' for row in rows)
+        finally:
+            await self.session.close()
+
     async def get_user(self, username: str):
         print('username :', username)
         print('username.lower :', username.lower())
-        user = await self.session.get(User, username.lower())
+        user = user_cache.get_by_username(username.lower())
+        if user is None:
+            version = user_cache.version
+            user = await self.session.get(User, username.lower())
+            if user:
+                user_cache.set(user, version)
 
         if not user:
             raise HTTPException(
@@ -56,14 +275,18 @@ class UserService:
             )
         return user
 
-    async def update_user(self, username: str, user: UserUpdate):
-        user_data = user.model_dump(exclude_unset=True)
-        if 'username' in user_data:
-            user_data['username'] = user_data['username'].lower()
-
-        if 'email' in user_data:
-            user_data['email'] = user_data['email'].lower()
+    async def get_user_by_uid(self, uid: uuid.UUID) -> User | None:
+        user = user_cache.get_by_uid(uid)
+        if user is None:
+            version = user_cache.version
+            result = await self.session.exec(select(User).where(User.uid == uid))
+            user = result.first()
+            if user:
+                user_cache.set(user, version)
+        return user
 
+    async def update_user(self, username: str, user: UserUpdate):
+        user_data = normalize_user_data(user)
         db_user = await self.session.get(User, username.lower())
 
         if not db_user:
@@ -72,20 +295,16 @@ class UserService:
                 detail='User not found.',
             )
 
-        if user_data.get('username') or user_data.get('email'):
-            user_check = await check_username_or_email_exists(
-                username=user_data.get('username'),
-                email=user_data.get('email'),
-                session=self.session,
-            )
-            if user_check:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=user_check,
-                )
+        await ensure_username_and_email_available(
+            self.session, user_data.get('username'), user_data.get('email')
+        )
         if user_data.get('new_password'):
-            if verify_password(user_data.get('old_password'), db_user.hashed_password):
-                user_data['hashed_password'] = hash_password(user_data['new_password'])
+            if await verify_password_async(
+                user_data.get('old_password'), db_user.hashed_password
+            ):
+                user_data['hashed_password'] = await hash_password_async(
+                    user_data['new_password']
+                )
                 del user_data['old_password']
                 del user_data['new_password']
             else:
@@ -93,21 +312,10 @@ class UserService:
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail='Old password is wrong.',
                 )
-        db_user.sqlmodel_update(user_data)
-
-        self.session.add(db_user)
-        await self.session.commit()
-        await self.session.refresh(db_user)
-        return db_user
+        return await self._write_user_update(username.lower(), user_data)
 
     async def update_user_admin(self, username: str, user: UserUpdate):
-        user_data = user.model_dump(exclude_unset=True)
-        if 'username' in user_data:
-            user_data['username'] = user_data['username'].lower()
-
-        if 'email' in user_data:
-            user_data['email'] = user_data['email'].lower()
-
+        user_data = normalize_user_data(user)
         db_user = await self.session.get(User, username.lower())
 
         if not db_user:
@@ -116,46 +324,203 @@ class UserService:
                 detail='User not found.',
             )
 
-        if user_data.get('username') or user_data.get('email'):
-            user_check = await check_username_or_email_exists(
-                username=user_data.get('username'),
-                email=user_data.get('email'),
-                session=self.session,
-            )
-            if user_check:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=user_check,
-                )
+        await ensure_username_and_email_available(
+            self.session, user_data.get('username'), user_data.get('email')
+        )
         if user_data.get('new_password'):
-            user_data['hashed_password'] = hash_password(user_data['new_password'])
+            user_data['hashed_password'] = await hash_password_async(
+                user_data['new_password']
+            )
             del user_data['new_password']
 
-        db_user.sqlmodel_update(user_data)
+        return await self._write_user_update(username.lower(), user_data)
 
-        self.session.add(db_user)
-        await self.session.commit()
-        await self.session.refresh(db_user)
+    async def _write_user_update(self, username: str, user_data: dict) -> User:
+        # Le hachage est fait avant : l'unité ne bloque pas le writer
+        async def apply_update(session: AsyncSession) -> User:
+            db_user = await session.get(User, username)
+            if not db_user:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail='User not found.',
+                )
+            await ensure_username_and_email_available(
+                session, user_data.get('username'), user_data.get('email')
+            )
+            db_user.sqlmodel_update(user_data)
+            session.add(db_user)
+            await session.flush()
+            return db_user
+
+        db_user = await run_write(self.session, apply_update)
+        if 'username' in user_data or 'email' in user_data:
+            await publish_users_taken([db_user.username], [db_user.email])
+        # L'uid ne change pas : il retrouve l'entrée même après un renommage
+        await publish_user_changed(db_user.uid, username, db_user.username)
         return db_user
 
     async def delete_user(self, username: str):
-        user = await self.session.get(User, username.lower())
+        async def remove_user(session: AsyncSession) -> uuid.UUID:
+            user = await session.get(User, username.lower())
 
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail='User not found.',
-            )
-        await self.session.delete(user)
-        await self.session.commit()
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail='User not found.',
+                )
+            user_uid = user.uid
+            await session.delete(user)
+            return user_uid
+
+        user_uid = await run_write(self.session, remove_user)
+        await publish_user_changed(user_uid, username.lower())
 
     async def delete_user_admin(self, username: str):
-        user = await self.session.get(User, username.lower())
+        await self.delete_user(username)
 
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail='User not found.',
+    async def batch_update_rank(
+        self, selector: UserBatchSelector, rank: int
+    ) -> UserBatchReport:
+        """
+        Set the rank of every selected user with a single UPDATE statement.
+
+        Args:
+            selector (UserBatchSelector): The usernames and/or filters.
+            rank (int): The new rank.
+
+        Returns:
+            UserBatchReport: One outcome per matched user, and per requested
+                username that is excluded by the filters or does not exist.
+        """
+        conditions = batch_conditions(selector)
+
+        async def update_users(session: AsyncSession) -> tuple[list, set[str]]:
+            result = await session.exec(
+                update(User)
+                .where(*conditions)
+                .values(rank=rank, updated_at=datetime.now())
+                .returning(User.uid, User.username)
             )
-        await self.session.delete(user)
-        await self.session.commit()
+            users = result.all()
+            return users, await remaining_usernames(session, selector)
+
+        users, remaining = await run_write(self.session, update_users)
+        await publish_users_changed(users)
+        return batch_report(selector, users, 'updated', remaining)
+
+    async def batch_delete(self, selector: UserBatchSelector) -> UserBatchReport:
+        conditions = batch_conditions(selector)
+
+        async def delete_users(session: AsyncSession) -> tuple[list, set[str]]:
+            result = await session.exec(
+                delete(User).where(*conditions).returning(User.uid, User.username)
+            )
+            users = result.all()
+            return users, await remaining_usernames(session, selector)
+
+        users, remaining = await run_write(self.session, delete_users)
+        await publish_users_changed(users)
+        return batch_report(selector, users, 'deleted', remaining)
+
+
+def initial_rank(username: str) -> int:
+    # Partagé par l'inscription et l'import en masse : même compte, même rank
+    if username == 'fkaisin':
+        return 1337
+    return User.model_fields['rank'].default
+
+
+def batch_conditions(selector: UserBatchSelector) -> list:
+    conditions = []
+    if selector.usernames is not None:
+        conditions.append(
+            User.username.in_({username.lower() for username in selector.usernames})
+        )
+    if selector.rank is not None:
+        conditions.append(User.rank == selector.rank)
+    if selector.created_before is not None:
+        conditions.append(User.created_at < selector.created_before)
+
+    # Jamais d'opération sur toute la table par oubli d'un critère
+    if not conditions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='At least one selection criterion is required.',
+        )
+    return conditions
+
+
+async def remaining_usernames(
+    session: AsyncSession, selector: UserBatchSelector
+) -> set[str]:
+    # Sans autre filtre, un username demandé non traité n'existe simplement pas
+    if selector.usernames is None or (
+        selector.rank is None and selector.created_before is None
+    ):
+        return set()
+    result = await session.exec(
+        select(User.username).where(
+            User.username.in_({username.lower() for username in selector.usernames})
+        )
+    )
+    return set(result.all())
+
+
+def batch_report(
+    selector: UserBatchSelector, users: list, outcome: str, remaining: set[str]
+) -> UserBatchReport:
+    matched = {username for _, username in users}
+    results = [
+        UserBatchResult(username=username, status=outcome)
+        for username in sorted(matched)
+    ]
+    # Usernames demandés mais non traités : exclus par les autres critères, ou absents
+    for username in dict.fromkeys(selector.usernames or ()):
+        if username.lower() in matched:
+            continue
+        skipped = username.lower() in remaining
+        results.append(
+            UserBatchResult(
+                username=username, status='skipped' if skipped else 'not_found'
+            )
+        )
+    return UserBatchReport(matched=len(matched), results=results)
+
+
+def normalize_user_data(user: UserUpdate) -> dict:
+    user_data = user.model_dump(exclude_unset=True)
+    if 'username' in user_data:
+        user_data['username'] = user_data['username'].lower()
+
+    if 'email' in user_data:
+        user_data['email'] = user_data['email'].lower()
+    return user_data
+
+
+async def ensure_username_and_email_available(
+    session: AsyncSession, username: str | None, email: str | None
+) -> None:
+    if not (username or email):
+        return
+    user_check = await check_username_or_email_exists(
+        username=username, email=email, session=session
+    )
+    if user_check:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=user_check,
+        )
+
+
+async def warm_user_cache(
+    session: AsyncSession, limit: int = settings.USER_CACHE_WARM_SIZE
+) -> int:
+    # Précharge les comptes modifiés le plus récemment, a priori les plus actifs
+    version = user_cache.version
+    result = await session.exec(
+        select(User).order_by(User.updated_at.desc()).limit(limit)
+    )
+    users = result.all()
+    for user in users:
+        user_cache.set(user, version)
+    return len(users)
@@ -0,0 +1,270 @@
+import codecs
+import csv
+import json
+import time
+import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import settings
+from src.db.models import User
+from src.db.writer import run_write
+from src.schemes.user import UserCreate
+from src.services.availability import publish_users_taken
+from src.services.user import initial_rank
+from src.utils.dbcheck import find_existing_users
+from src.utils.security import hash_passwords_async
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # Découpe le corps en lignes au fil de l'eau, sans le charger en entier
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split('\n')
+        for line in lines:
+            yield line.rstrip('\r')
+    buffer += decoder.decode(b'', final=True)
+    if buffer:
+        yield buffer.rstrip('\r')
+
+
+async def iter_records(
+    lines: AsyncIterator[str], import_format: str
+) -> AsyncIterator[tuple[int, str]]:
+    """
+    Number the records of the body, by their first line.
+
+    In CSV, a quoted field may contain line breaks: physical lines are joined
+    until every quote is closed, so that one record is parsed as a whole.
+
+    Args:
+        lines (AsyncIterator[str]): The physical lines, from iter_lines().
+        import_format (str): 'ndjson' (one record per line) or 'csv'.
+
+    Yields:
+        tuple[int, str]: The line number where the record starts, the record.
+    """
+    record: list[str] = []
+    quotes = 0
+    start = line_number = 0
+    async for line in lines:
+        line_number += 1
+        if import_format != 'csv':
+            yield line_number, line
+            continue
+
+        if not record:
+            start = line_number
+        record.append(line)
+        # Nombre impair de guillemets : un champ entre guillemets reste ouvert
+        quotes += line.count('"')
+        if quotes % 2 == 0:
+            yield start, '\n'.join(record)
+            record, quotes = [], 0
+
+    if record:
+        # Guillemet jamais refermé : rejeté par le lecteur strict
+        yield start, '\n'.join(record)
+
+
+class UserImportService:
+    """
+    Bulk user import from a streamed CSV or NDJSON body.
+
+    Rows are processed in batches: duplicates are checked with one query per
+    batch, passwords are hashed in parallel on the hashing pool, and each
+    batch is inserted with a single executemany statement through the writer.
+    """
+
+    def __init__(
+        self, session: AsyncSession, max_errors: int = settings.USERS_IMPORT_MAX_ERRORS
+    ):
+        self.session = session
+        # Réponse bornée : seules les max_errors premières erreurs sont détaillées
+        self.max_errors = max_errors
+        self.errors: list[dict] = []
+        self.failed = 0
+        self.rows = 0
+        self.imported = 0
+        # Doublons à l'intérieur de l'import lui-même
+        self._seen_usernames: set[str] = set()
+        self._seen_emails: set[str] = set()
+
+    async def import_users(
+        self,
+        chunks: AsyncIterator[bytes],
+        import_format: str,
+        batch_size: int = settings.USERS_IMPORT_BATCH,
+    ) -> dict:
+        """
+        Import users and report the rejected rows.
+
+        Args:
+            chunks (AsyncIterator[bytes]): The request body.
+            import_format (str): 'ndjson' or 'csv' (with a header line).
+            batch_size (int): The number of rows hashed and inserted at once.
+
+        Returns:
+            dict: A summary with the first per-row errors and the throughput.
+        """
+        start = time.perf_counter()
+        batch: list[tuple[int, UserCreate]] = []
+
+        async for line_number, data in self._parse(chunks, import_format):
+            self.rows += 1
+            try:
+                user = UserCreate.model_validate(data)
+            except ValidationError as exc:
+                self._reject(line_number, data, self._validation_detail(exc))
+                continue
+
+            user.username = user.username.lower()
+            user.email = user.email.lower()
+            if user.username in self._seen_usernames:
+                self._reject(line_number, data, 'Duplicate username in import.')
+            elif user.email in self._seen_emails:
+                self._reject(line_number, data, 'Duplicate email in import.')
+            else:
+                self._seen_usernames.add(user.username)
+                self._seen_emails.add(user.email)
+                batch.append((line_number, user))
+
+            if len(batch) >= batch_size:
+                await self._import_batch(batch)
+                batch = []
+
+        if batch:
+            await self._import_batch(batch)
+
+        elapsed = time.perf_counter() - start
+        return {
+            'format': import_format,
+            'rows': self.rows,
+            'imported': self.imported,
+            'failed': self.failed,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(self.rows / elapsed, 1) if elapsed else 0.0,
+            'errors': self.errors,
+            'errors_truncated': self.failed - len(self.errors),
+        }
+
+    async def _parse(
+        self, chunks: AsyncIterator[bytes], import_format: str
+    ) -> AsyncIterator[tuple[int, dict]]:
+        header = None
+        async for line_number, record in iter_records(
+            iter_lines(chunks), import_format
+        ):
+            if not record.strip():
+                continue
+
+            if import_format == 'csv':
+                try:
+                    values = next(csv.reader([record], strict=True))
+                except csv.Error as exc:
+                    self.rows += 1
+                    self._reject(line_number, {}, f'Invalid CSV: {exc}.')
+                    continue
+                if header is None:
+                    header = values
+                    continue
+                yield line_number, dict(zip(header, values))
+                continue
+
+            try:
+                data = json.loads(record)
+            except ValueError:
+                self.rows += 1
+                self._reject(line_number, {}, 'Invalid JSON.')
+                continue
+            if not isinstance(data, dict):
+                self.rows += 1
+                self._reject(line_number, {}, 'Invalid JSON object.')
+                continue
+            yield line_number, data
+
+    async def _import_batch(self, batch: list[tuple[int, UserCreate]]) -> None:
+        # Vérification anticipée : pas de hachage bcrypt pour les doublons
+        batch = await self._drop_existing(self.session, batch)
+        if not batch:
+            return
+
+        hashed_passwords = await hash_passwords_async(
+            [user.password for _, user in batch]
+        )
+        now = datetime.now()
+        rows = [
+            {
+                'username': user.username,
+                'email': user.email,
+                'uid': uuid.uuid4(),
+                'hashed_password': hashed_password,
+                'rank': initial_rank(user.username),
+                'created_at': now,
+                'updated_at': now,
+            }
+            for (_, user), hashed_password in zip(batch, hashed_passwords)
+        ]
+        lines = [line_number for line_number, _ in batch]
+
+        async def insert_batch(session: AsyncSession) -> list[dict]:
+            # Revérifié par le writer : des inscriptions ont pu arriver entre-temps
+            kept = [
+                row
+                for _, row in await self._drop_existing(session, list(zip(lines, rows)))
+            ]
+            if kept:
+                await session.exec(insert(User), params=kept)
+            return kept
+
+        inserted = await run_write(self.session, insert_batch)
+        self.imported += len(inserted)
+        await publish_users_taken(
+            [row['username'] for row in inserted], [row['email'] for row in inserted]
+        )
+
+    async def _drop_existing(self, session: AsyncSession, batch: list) -> list:
+        usernames = {self._field(item, 'username') for _, item in batch}
+        emails = {self._field(item, 'email') for _, item in batch}
+        existing_usernames, existing_emails = await find_existing_users(
+            session, usernames, emails
+        )
+
+        kept = []
+        for line_number, item in batch:
+            username = self._field(item, 'username')
+            if username in existing_usernames:
+                self._reject(
+                    line_number, {'username': username}, 'Username already exists.'
+                )
+            elif self._field(item, 'email') in existing_emails:
+                self._reject(
+                    line_number, {'username': username}, 'Email already exists.'
+                )
+            else:
+                kept.append((line_number, item))
+        return kept
+
+    @staticmethod
+    def _field(item: UserCreate | dict, name: str) -> str:
+        return item[name] if isinstance(item, dict) else getattr(item, name)
+
+    @staticmethod
+    def _validation_detail(exc: ValidationError) -> str:
+        return '; '.join(
+            f'{".".join(map(str, error["loc"]))}: {error["msg"]}'
+            for error in exc.errors()
+        )
+
+    def _reject(self, line_number: int, data: dict, detail: str) -> None:
+        self.failed += 1
+        if len(self.errors) >= self.max_errors:
+            return
+        self.errors.append(
+            {'line': line_number, 'username': data.get('username'), 'detail': detail}
+        )
@@ -1,3 +1,4 @@
+import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import create_async_engine
@@ -5,27 +6,74 @@ from sqlmodel import Session, SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.pool import StaticPool
 from src import app
-from src.db.main import get_session
+from src.db.audit import QueryPlanAuditor
+from src.db.main import engine as app_engine
+from src.db.main import get_read_session, get_session
 from src.db.models import User
 from src.schemes.user import UserCreate, UserPublic, UserUpdate
+from src.services.auth import (
+    build_access_claims,
+    login_ip_limiter,
+    login_username_limiter,
+)
+from src.services.availability import availability_index
+from src.services.user import response_cache, user_cache
+from src.utils.security import (
+    access_token_cache,
+    create_access_token,
+    revoked_refresh_jtis,
+)
 
 TEST_USERNAME = 'testUser'
 TEST_EMAIL = 'test@mail.com'
 TEST_PASSWORD = 'testPassword'
 
+query_plan_auditor = QueryPlanAuditor()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--query-plan-audit',
+        choices=('off', 'report', 'strict'),
+        default='report',
+        help='Audit query plans for full table scans (strict: fail the run).',
+    )
+
+
+def pytest_configure(config):
+    if config.getoption('--query-plan-audit') != 'off':
+        query_plan_auditor.attach(app_engine)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    mode = session.config.getoption('--query-plan-audit')
+    if mode == 'strict' and query_plan_auditor.flagged and exitstatus == 0:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if config.getoption('--query-plan-audit') == 'off':
+        return
+    terminalreporter.section('query plan audit')
+    terminalreporter.write_line(query_plan_auditor.report())
+
 
 @pytest_asyncio.fixture(name='session')
-async def session_fixture():
+async def session_fixture(request: pytest.FixtureRequest):
     engine = create_async_engine(
         'sqlite+aiosqlite://',
         connect_args={'check_same_thread': False},
         poolclass=StaticPool,
     )
+    if request.config.getoption('--query-plan-audit') != 'off':
+        query_plan_auditor.attach(engine)
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
-    async_session = AsyncSession(engine)
+    # Même configuration que les sessions de l'application
+    async_session = AsyncSession(engine, expire_on_commit=False)
     yield async_session
     await async_session.close()
+    await engine.dispose()
 
 
 @pytest_asyncio.fixture(name='client')
@@ -34,6 +82,14 @@ async def client_fixture(session: Session):
         return session
 
     app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_session_override
+    login_ip_limiter.clear()
+    login_username_limiter.clear()
+    access_token_cache.clear()
+    revoked_refresh_jtis.clear()
+    user_cache.clear()
+    response_cache.clear()
+    availability_index.clear()
 
     async with AsyncClient(
         transport=ASGITransport(app=app), base_url='http://test'
@@ -58,3 +114,15 @@ async def initial_user_fixture(client: AsyncClient):
     )
 
     yield
+
+
+@pytest_asyncio.fixture(name='admin_headers')
+async def admin_headers_fixture(session: AsyncSession):
+    admin = User(
+        username='admin', email='admin@mail.com', hashed_password='x', rank=1337
+    )
+    session.add(admin)
+    await session.commit()
+
+    token = create_access_token(data=build_access_claims(admin))
+    yield {'Authorization': f'Bearer {token}'}
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from src.tests.conftest import TEST_PASSWORD, TEST_USERNAME
+from src.utils.admission import AdmissionLimiter
+from src.utils.security import hashing_limiter
+
+
+@pytest.mark.asyncio
+async def test_limiter_queues_then_rejects_when_queue_is_full():
+    limiter = AdmissionLimiter(max_concurrency=1, max_queue=1)
+    release_first = asyncio.Event()
+
+    async def hold_slot():
+        async with limiter.slot():
+            await release_first.wait()
+
+    first = asyncio.create_task(hold_slot())
+    await asyncio.sleep(0)
+    second = asyncio.create_task(hold_slot())
+    await asyncio.sleep(0)
+
+    assert limiter.active == 1
+    assert limiter.queue_depth == 1
+
+    with pytest.raises(HTTPException) as exc_info:
+        await limiter.acquire()
+
+    assert exc_info.value.status_code == 503
+    assert int(exc_info.value.headers['Retry-After']) >= 1
+
+    release_first.set()
+    await asyncio.gather(first, second)
+
+    stats = limiter.stats()
+    assert stats['admitted'] == 2
+    assert stats['rejected'] == 1
+    assert stats['queue_depth'] == 0
+    assert stats['active'] == 0
+    assert stats['max_wait_seconds'] > 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_cancelled_waiter_leaves_queue():
+    limiter = AdmissionLimiter(max_concurrency=1, max_queue=2)
+    await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert limiter.queue_depth == 0
+    limiter.release()
+    assert limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_login_rejected_with_503_when_hashing_is_saturated(
+    client: AsyncClient, initial_user, monkeypatch
+):
+    monkeypatch.setattr(hashing_limiter, 'max_concurrency', 1)
+    monkeypatch.setattr(hashing_limiter, 'max_queue', 0)
+    await hashing_limiter.acquire()
+    try:
+        response = await client.post(
+            '/auth/login',
+            data={'username': TEST_USERNAME, 'password': TEST_PASSWORD},
+        )
+    finally:
+        hashing_limiter.release()
+
+    assert response.status_code == 503
+    assert response.json()['detail'] == 'Server busy, please retry later.'
+    assert int(response.headers['Retry-After']) >= 1
@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.pool import StaticPool
+from src.db.audit import QueryPlanAuditor
+
+
+@pytest.mark.asyncio
+async def test_query_plan_auditor_flags_unindexed_filters():
+    engine = create_async_engine('sqlite+aiosqlite://', poolclass=StaticPool)
+    auditor = QueryPlanAuditor()
+    auditor.attach(engine)
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, code TEXT)')
+        )
+        await conn.execute(text('CREATE INDEX ix_items_code ON items (code)'))
+        await conn.execute(
+            text('SELECT * FROM items WHERE name = :name'), {'name': 'a'}
+        )
+        await conn.execute(
+            text('SELECT * FROM items WHERE code = :code'), {'code': 'a'}
+        )
+        await conn.execute(text('SELECT * FROM items'))
+
+    auditor.detach(engine)
+    await engine.dispose()
+
+    assert len(auditor.plans) == 3
+    assert list(auditor.flagged) == ['SELECT * FROM items WHERE name = ?']
+    assert 'SELECT * FROM items WHERE name = ?' in auditor.report()
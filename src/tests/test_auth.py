@@ -1,17 +1,30 @@
 import uuid
 from datetime import UTC, datetime, timedelta, timezone
+from http.cookies import SimpleCookie
 
 import jwt
 import pytest
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession as SQLModelAsyncSession
+from src.db import writer
 from src.config import settings
-from src.db.models import User
+from src.db.models import RefreshToken, User
+from src.db.writer import WriteQueue
 from src.tests.conftest import TEST_EMAIL, TEST_PASSWORD, TEST_USERNAME
+from src.services.auth import login_username_limiter
+from src.services.refresh_token import (
+    load_revoked_refresh_tokens,
+    prune_expired_refresh_tokens,
+)
 from src.utils.security import (
+    configure_password_context,
+    hashing_limiter,
     create_access_token,
     create_refresh_token,
+    pwd_context,
+    revoked_refresh_jtis,
     verify_password,
 )
 
@@ -50,6 +63,60 @@ async def test_login_successful(client: AsyncClient, initial_user):
     assert rt_payload.get('sub') == user_uid_db
 
 
+@pytest.mark.asyncio
+async def test_login_rehashes_password_with_new_cost(
+    client: AsyncClient, session: AsyncSession
+):
+    initial_config = pwd_context.to_dict()
+    try:
+        configure_password_context(4)
+        await client.post(
+            '/auth/register',
+            json={
+                'username': TEST_USERNAME,
+                'email': TEST_EMAIL,
+                'password': TEST_PASSWORD,
+            },
+        )
+        configure_password_context(5)
+        response = await client.post(
+            '/auth/login',
+            data={
+                'username': TEST_USERNAME,
+                'password': TEST_PASSWORD,
+            },
+        )
+    finally:
+        pwd_context.load(initial_config)
+
+    user = await session.get(User, TEST_USERNAME.lower())
+
+    assert response.status_code == 202
+    assert user.hashed_password.startswith('$2b$05$')
+    assert verify_password(TEST_PASSWORD, user.hashed_password)
+
+
+@pytest.mark.asyncio
+async def test_login_keeps_stronger_hash(
+    client: AsyncClient, session: AsyncSession, initial_user
+):
+    hashed_password = (await session.get(User, TEST_USERNAME.lower())).hashed_password
+    initial_config = pwd_context.to_dict()
+    try:
+        configure_password_context(4)
+        response = await client.post(
+            '/auth/login',
+            data={'username': TEST_USERNAME, 'password': TEST_PASSWORD},
+        )
+    finally:
+        pwd_context.load(initial_config)
+
+    user = await session.get(User, TEST_USERNAME.lower())
+
+    assert response.status_code == 202
+    assert user.hashed_password == hashed_password
+
+
 @pytest.mark.asyncio
 async def test_login_wrong_user(client: AsyncClient, initial_user):
     response = await client.post(
@@ -82,6 +149,27 @@ async def test_login_wrong_password(client: AsyncClient, initial_user):
     assert data['detail'] == 'Invalid username or password.'
 
 
+@pytest.mark.asyncio
+async def test_login_rate_limited_by_username(client: AsyncClient, initial_user):
+    for _ in range(login_username_limiter.capacity):
+        await client.post(
+            '/auth/login',
+            data={'username': TEST_USERNAME, 'password': 'WrongPassword'},
+        )
+
+    admitted = hashing_limiter.admitted
+    response = await client.post(
+        '/auth/login',
+        data={'username': TEST_USERNAME.upper(), 'password': TEST_PASSWORD},
+    )
+
+    assert response.status_code == 429
+    assert response.json()['detail'] == 'Too many login attempts, please retry later.'
+    assert int(response.headers['Retry-After']) >= 1
+    # Rejeté avant tout hachage
+    assert hashing_limiter.admitted == admitted
+
+
 @pytest.mark.asyncio
 async def test_access_protected_route_with_valid_token(
     client: AsyncClient, initial_user
@@ -108,6 +196,22 @@ async def test_access_protected_route_with_valid_token(
     assert protected_response.json()['username'] == TEST_USERNAME.lower()
 
 
+@pytest.mark.asyncio
+async def test_read_user_me_conditional(client: AsyncClient, initial_user):
+    response = await client.post(
+        '/auth/login', data={'username': TEST_USERNAME, 'password': TEST_PASSWORD}
+    )
+    headers = {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+    response = await client.get('/auth/me', headers=headers)
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+    response = await client.get('/auth/me', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.content == b''
+
+
 @pytest.mark.asyncio
 async def test_access_protected_route_with_not_valid_token(
     client: AsyncClient, initial_user
@@ -175,6 +279,122 @@ async def test_refresh_token_success(client: AsyncClient, initial_user):
     assert data['token_type'] == 'bearer'
 
 
+@pytest.mark.asyncio
+async def test_refresh_token_rotation(client: AsyncClient, initial_user):
+    login_response = await client.post(
+        '/auth/login',
+        data={'username': TEST_USERNAME, 'password': TEST_PASSWORD},
+    )
+    first_refresh_token = login_response.cookies.get('refreshToken')
+
+    client.cookies.set('refreshToken', first_refresh_token)
+    refresh_response = await client.post('/auth/refresh')
+    second_refresh_token = refresh_response.cookies.get('refreshToken')
+
+    assert refresh_response.status_code == 200
+    assert second_refresh_token is not None
+    assert second_refresh_token != first_refresh_token
+
+    # Le premier token a déjà servi : sa réutilisation révoque toute la famille
+    client.cookies.set('refreshToken', first_refresh_token)
+    reuse_response = await client.post('/auth/refresh')
+
+    assert reuse_response.status_code == 401
+    assert reuse_response.json()['detail'] == 'Refresh token revoked. Please login.'
+
+    client.cookies.set('refreshToken', second_refresh_token)
+    revoked_response = await client.post('/auth/refresh')
+
+    assert revoked_response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_refresh_token(client: AsyncClient, initial_user):
+    login_response = await client.post(
+        '/auth/login',
+        data={'username': TEST_USERNAME, 'password': TEST_PASSWORD},
+    )
+    # Cookie rejoué avec le Path posé par le serveur, comme le ferait un navigateur
+    cookie = SimpleCookie(login_response.headers['set-cookie'])['refreshToken']
+    assert '/auth/logout'.startswith(cookie['path'])
+    client.cookies.set('refreshToken', cookie.value, path=cookie['path'])
+
+    logout_response = await client.post('/auth/logout')
+    refresh_response = await client.post('/auth/refresh')
+
+    assert logout_response.status_code == 200
+    assert refresh_response.status_code == 401
+    assert refresh_response.json()['detail'] == 'Refresh token revoked. Please login.'
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_writes_go_through_the_writer(
+    client: AsyncClient,
+    session: AsyncSession,
+    initial_user,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    queue = WriteQueue(
+        async_sessionmaker(
+            session.bind, class_=SQLModelAsyncSession, expire_on_commit=False
+        )
+    )
+    monkeypatch.setattr(writer, 'write_queue', queue)
+    await queue.start()
+    try:
+        login_response = await client.post(
+            '/auth/login',
+            data={'username': TEST_USERNAME, 'password': TEST_PASSWORD},
+        )
+        client.cookies.set('refreshToken', login_response.cookies['refreshToken'])
+        refresh_response = await client.post('/auth/refresh')
+        client.cookies.set('refreshToken', refresh_response.cookies['refreshToken'])
+        await client.post('/auth/logout')
+    finally:
+        await queue.stop()
+
+    assert refresh_response.status_code == 200
+    # Émission, rotation, révocation : une unité chacune
+    assert queue.stats()['units'] == 3
+    tokens = (await session.exec(select(RefreshToken))).all()
+    assert len(tokens) == 2
+    assert all(token.used_at or token.revoked_at for token in tokens)
+
+
+@pytest.mark.asyncio
+async def test_prune_expired_refresh_tokens(session: AsyncSession):
+    now = datetime.now()
+    session.add_all(
+        [
+            RefreshToken(
+                jti=f'expired-{index}',
+                user_uid=uuid.uuid4(),
+                expires_at=now - timedelta(minutes=1),
+                used_at=now,
+            )
+            for index in range(3)
+        ]
+        + [
+            RefreshToken(
+                jti='valid',
+                user_uid=uuid.uuid4(),
+                expires_at=now + timedelta(hours=1),
+                revoked_at=now,
+            )
+        ]
+    )
+    await session.commit()
+
+    pruned = await prune_expired_refresh_tokens(session, batch_size=2)
+    loaded = await load_revoked_refresh_tokens(session)
+    remaining = await session.exec(select(RefreshToken.jti))
+
+    assert pruned == 3
+    assert loaded == 1
+    assert remaining.all() == ['valid']
+    assert 'valid' in revoked_refresh_jtis
+
+
 @pytest.mark.asyncio
 async def test_refresh_token_missing_cookie(client: AsyncClient):
     # Appel sans cookie refresh_token
@@ -222,8 +442,82 @@ async def test_refresh_token_user_not_found(client: AsyncClient, initial_user):
     assert response.json()['detail'] == 'Refresh token user ID not found.'
 
 
+@pytest.mark.asyncio
+async def test_refresh_token_unknown_jti_rejected(client: AsyncClient, initial_user):
+    user = await client.get(f'users/{TEST_USERNAME}')
+    # Signé correctement, mais jamais émis par /auth/login
+    refresh_token = create_refresh_token(data={'sub': user.json()['uid']})
+    client.cookies.set('refreshToken', refresh_token)
+    response = await client.post('/auth/refresh')
+
+    assert response.status_code == 401
+    assert response.json()['detail'] == 'Refresh token revoked. Please login.'
+
+
 @pytest.mark.asyncio
 async def test_logout_success(client: AsyncClient):
     response = await client.post('/auth/logout')
     assert response.status_code == 200
     assert response.json()['detail'] == 'Logged out successfully.'
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_keeps_access_claims(client: AsyncClient, initial_user):
+    login_response = await client.post(
+        '/auth/login',
+        data={'username': TEST_USERNAME, 'password': TEST_PASSWORD},
+    )
+    client.cookies.set('refreshToken', login_response.cookies.get('refreshToken'))
+    refresh_response = await client.post('/auth/refresh')
+
+    payload = jwt.decode(
+        refresh_response.json()['access_token'],
+        key=settings.JWT_SECRET_KEY,
+        algorithms=[settings.JWT_ALGORITHM],
+    )
+
+    assert payload['rank'] == 1020
+    assert payload['username'] == TEST_USERNAME.lower()
+
+
+@pytest.mark.asyncio
+async def test_stateless_admin_route_needs_no_user_row(
+    client: AsyncClient, session: AsyncSession, monkeypatch
+):
+    monkeypatch.setattr(settings, 'AUTH_STATELESS', True)
+    admin = User(
+        username='admin', email='admin@mail.com', hashed_password='x', rank=1337
+    )
+    session.add(admin)
+    await session.commit()
+    await session.refresh(admin)
+    access_token = create_access_token(
+        data={'sub': str(admin.uid), 'rank': admin.rank, 'username': admin.username}
+    )
+
+    # Le compte n'existe plus en base : seul le token fait foi
+    await session.delete(admin)
+    await session.commit()
+    response = await client.get(
+        '/internal/hashing', headers={'Authorization': f'Bearer {access_token}'}
+    )
+
+    assert response.status_code == 200
+    assert response.json()['name'] == 'password_hashing'
+
+
+@pytest.mark.asyncio
+async def test_stateless_admin_route_rejects_non_admin_claims(
+    client: AsyncClient, monkeypatch
+):
+    monkeypatch.setattr(settings, 'AUTH_STATELESS', True)
+    access_token = create_access_token(
+        data={'sub': str(uuid.uuid4()), 'rank': 1020, 'username': 'user'}
+    )
+
+    response = await client.get(
+        '/internal/hashing', headers={'Authorization': f'Bearer {access_token}'}
+    )
+
+    assert response.status_code == 401
+    assert response.json()['detail'] == 'Requires admin privilege.'
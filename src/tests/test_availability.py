@@ -0,0 +1,51 @@
+import pytest
+from httpx import AsyncClient
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.services.availability import availability_index
+from src.tests.conftest import TEST_EMAIL, TEST_USERNAME
+
+
+@pytest.mark.asyncio
+async def test_available_falls_back_to_db_until_loaded(
+    client: AsyncClient, initial_user
+):
+    response = await client.get(
+        '/auth/available', params={'username': TEST_USERNAME, 'email': 'free@mail.com'}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {'username': False, 'email': True}
+    assert availability_index.stats()['db_checks'] >= 1
+
+
+@pytest.mark.asyncio
+async def test_available_answers_from_filters_once_loaded(
+    client: AsyncClient, session: AsyncSession, initial_user
+):
+    assert await availability_index.load(session) == 1
+    filter_answers = availability_index.filter_answers
+
+    response = await client.get('/auth/available', params={'username': 'free'})
+
+    assert response.json() == {'username': True}
+    assert availability_index.filter_answers == filter_answers + 1
+
+    # Un username pris doit être confirmé par la base
+    response = await client.get('/auth/available', params={'email': TEST_EMAIL})
+
+    assert response.json() == {'email': False}
+
+    # Les inscriptions alimentent les filtres
+    await client.post(
+        '/auth/register',
+        json={'username': 'newUser', 'email': 'new@mail.com', 'password': 'pw'},
+    )
+    assert 'newuser' in availability_index.usernames
+    assert 'new@mail.com' in availability_index.emails
+
+
+@pytest.mark.asyncio
+async def test_available_requires_a_value(client: AsyncClient):
+    response = await client.get('/auth/available')
+
+    assert response.status_code == 400
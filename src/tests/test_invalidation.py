@@ -0,0 +1,67 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.schemes.user import UserUpdateAdmin
+from src.services.user import USER_CHANGED, UserService, user_cache
+from src.tests.conftest import TEST_USERNAME
+from src.utils.invalidation import (
+    LocalInvalidationBus,
+    SQLiteInvalidationBus,
+    invalidation_bus,
+)
+
+
+@pytest.mark.asyncio
+async def test_local_bus_applies_events_to_subscribers():
+    bus = LocalInvalidationBus()
+    received = []
+    bus.subscribe('event', received.append)
+
+    await bus.publish('event', {'key': 'value'})
+    await bus.publish('other', {'key': 'ignored'})
+
+    assert received == [{'key': 'value'}]
+    assert bus.stats()['published'] == 2
+
+
+@pytest.mark.asyncio
+async def test_sqlite_bus_delivers_events_to_other_workers(tmp_path):
+    path = str(tmp_path / 'invalidation.sqlite')
+    worker_a, worker_b = SQLiteInvalidationBus(path), SQLiteInvalidationBus(path)
+    received_a, received_b = [], []
+    worker_a.subscribe('event', received_a.append)
+    worker_b.subscribe('event', received_b.append)
+    await worker_a.start()
+    await worker_b.start()
+    try:
+        await worker_a.publish('event', {'key': 'value'})
+        await worker_a.poll()
+        await worker_b.poll()
+    finally:
+        await worker_a.stop()
+        await worker_b.stop()
+
+    # Appliqué une seule fois chez l'émetteur, reçu par l'autre worker
+    assert received_a == [{'key': 'value'}]
+    assert received_b == [{'key': 'value'}]
+    assert worker_b.stats()['received'] == 1
+
+
+@pytest.mark.asyncio
+async def test_user_service_publishes_user_changed(
+    client: AsyncClient, session: AsyncSession, initial_user
+):
+    received = []
+    invalidation_bus.subscribe(USER_CHANGED, received.append)
+    try:
+        user = await UserService(session).get_user(TEST_USERNAME)
+        await UserService(session).update_user_admin(
+            TEST_USERNAME, UserUpdateAdmin(username='renamed')
+        )
+    finally:
+        invalidation_bus.unsubscribe(USER_CHANGED, received.append)
+
+    assert received == [
+        {'uid': str(user.uid), 'usernames': [TEST_USERNAME.lower(), 'renamed']}
+    ]
+    assert user_cache.get_by_uid(user.uid) is None
@@ -0,0 +1,77 @@
+from datetime import UTC, datetime, timedelta
+
+import jwt
+import pytest
+from src.utils.jwt_codec import TokenCodec
+
+KEY = 'test-secret-key-with-enough-entropy-for-hs512-tests-0123456789'
+
+
+def make_payload(delta: timedelta = timedelta(minutes=5)) -> dict:
+    return {
+        'sub': 'a0c5b4d8-57a9-4e55-a1c1-6a2bbd2a5c7f',
+        'rank': 1020,
+        'username': 'testuser',
+        'exp': datetime.now(UTC) + delta,
+    }
+
+
+@pytest.mark.parametrize('algorithm', ['HS256', 'HS384', 'HS512'])
+def test_encode_is_identical_to_pyjwt(algorithm):
+    codec = TokenCodec(KEY, algorithm)
+    payload = make_payload()
+
+    assert codec.fast_path
+    assert codec.encode(payload) == jwt.encode(payload, KEY, algorithm=algorithm)
+
+
+@pytest.mark.parametrize('algorithm', ['HS256', 'HS384', 'HS512'])
+def test_decode_round_trips_with_pyjwt(algorithm):
+    codec = TokenCodec(KEY, algorithm)
+    payload = make_payload()
+
+    pyjwt_token = jwt.encode(payload, KEY, algorithm=algorithm)
+    codec_token = codec.encode(payload)
+
+    assert codec.decode(pyjwt_token) == jwt.decode(
+        codec_token, KEY, algorithms=[algorithm]
+    )
+
+
+def test_decode_expired_token_raises_like_pyjwt():
+    codec = TokenCodec(KEY, 'HS256')
+    token = codec.encode(make_payload(timedelta(seconds=-1)))
+
+    with pytest.raises(jwt.ExpiredSignatureError):
+        codec.decode(token)
+
+
+@pytest.mark.parametrize(
+    'token',
+    [
+        'random0access0token',
+        'a.b.c',
+        TokenCodec('another-key', 'HS256').encode(make_payload()),
+        TokenCodec(KEY, 'HS256').encode(make_payload())[:-2] + 'xx',
+        jwt.encode(make_payload(), KEY, algorithm='HS512'),
+    ],
+)
+def test_decode_invalid_tokens_raise_invalid_token_error(token):
+    codec = TokenCodec(KEY, 'HS256')
+
+    with pytest.raises(jwt.InvalidTokenError):
+        codec.decode(token)
+
+
+def test_decode_falls_back_to_pyjwt_for_other_headers_and_claims():
+    codec = TokenCodec(KEY, 'HS256')
+    with_kid = jwt.encode(make_payload(), KEY, algorithm='HS256', headers={'kid': '1'})
+    future_nbf = jwt.encode(
+        {**make_payload(), 'nbf': datetime.now(UTC) + timedelta(minutes=1)},
+        KEY,
+        algorithm='HS256',
+    )
+
+    assert codec.decode(with_kid)['username'] == 'testuser'
+    with pytest.raises(jwt.ImmatureSignatureError):
+        codec.decode(future_nbf)
@@ -0,0 +1,54 @@
+import pytest
+from httpx import AsyncClient
+from src.tests.conftest import TEST_USERNAME
+from src.utils.metrics import Histogram, stats_gauges
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram('latency_seconds', 'Latency.', ('route',), buckets=(0.1, 1.0))
+    histogram.observe(0.05, '/a"b')
+    histogram.observe(0.5, '/a"b')
+    histogram.observe(5, '/a"b')
+
+    lines = histogram.render()
+
+    assert '# TYPE latency_seconds histogram' in lines
+    assert 'latency_seconds_bucket{route="/a\\"b",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a\\"b",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{route="/a\\"b"} 5.55' in lines
+    assert 'latency_seconds_count{route="/a\\"b"} 3' in lines
+
+
+def test_stats_gauges_flatten_numeric_fields():
+    lines = stats_gauges(
+        'app_cache',
+        'cache',
+        {'user': {'name': 'user', 'hits': 3, 'ready': True, 'bloom': {'count': 2}}},
+        'Cache stats.',
+    )
+
+    assert 'app_cache_hits{cache="user"} 3' in lines
+    assert 'app_cache_ready{cache="user"} 1' in lines
+    assert 'app_cache_bloom_count{cache="user"} 2' in lines
+    assert not any(line.startswith('app_cache_name') for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_labels_routes_by_template(
+    client: AsyncClient, initial_user
+):
+    await client.get(f'/users/{TEST_USERNAME}')
+    await client.get('/no-such-route')
+
+    response = await client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    assert (
+        'http_requests_total{method="GET",route="/users/{username}",status="200"}'
+        in response.text
+    )
+    assert 'route="unmatched",status="404"' in response.text
+    assert 'password_hash_duration_seconds_count{operation="hash"}' in response.text
+    assert 'app_db_pool_checked_out{pool="default"}' in response.text
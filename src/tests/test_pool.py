@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from src.db.pool import InstrumentedAsyncPool
+
+
+@pytest.mark.asyncio
+async def test_instrumented_pool_counts_checkouts_and_timeouts(tmp_path):
+    engine = create_async_engine(
+        f'sqlite+aiosqlite:///{tmp_path / "pool.sqlite"}',
+        poolclass=InstrumentedAsyncPool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+
+    async with engine.connect():
+        assert engine.pool.stats()['checked_out'] == 1
+        with pytest.raises(PoolTimeoutError):
+            async with engine.connect():
+                pass
+
+    stats = engine.pool.stats()
+    await engine.dispose()
+
+    assert stats['checked_out'] == 0
+    assert stats['checkouts'] == 1
+    assert stats['timeouts'] == 1
+    assert stats['peak_checked_out'] == 1
+    assert stats['max_wait_ms'] >= 50
@@ -0,0 +1,48 @@
+import pytest
+from src.utils.ratelimit import TokenBucketLimiter
+
+
+def test_token_bucket_allows_burst_then_rejects():
+    limiter = TokenBucketLimiter(capacity=2, refill_per_second=1)
+
+    assert limiter.consume('key', now=0) == 0
+    assert limiter.consume('key', now=0) == 0
+    assert limiter.consume('key', now=0) == 1
+    assert limiter.consume('other', now=0) == 0
+
+
+def test_token_bucket_refills_over_time():
+    limiter = TokenBucketLimiter(capacity=1, refill_per_second=0.5)
+
+    assert limiter.consume('key', now=0) == 0
+    assert limiter.consume('key', now=1) == 1
+    assert limiter.consume('key', now=2) == 0
+
+
+def test_token_bucket_memory_is_bounded():
+    limiter = TokenBucketLimiter(capacity=1, refill_per_second=1, max_keys=2)
+
+    for key in ('a', 'b', 'c'):
+        limiter.consume(key, now=0)
+
+    assert len(limiter) == 2
+    # 'a' a été évincé : il repart avec un bucket plein
+    assert limiter.consume('a', now=0) == 0
+
+
+def test_token_bucket_sweep_evicts_refilled_buckets():
+    limiter = TokenBucketLimiter(
+        capacity=2, refill_per_second=1, sweep_interval_seconds=10
+    )
+    limiter.consume('idle', now=limiter._last_sweep)
+    limiter.consume('busy', now=limiter._last_sweep + 9)
+    limiter.consume('busy', now=limiter._last_sweep + 10)
+
+    assert len(limiter) == 1
+    assert limiter.stats()['allowed'] == 3
+
+
+@pytest.mark.parametrize('refill_per_second', [0, -1])
+def test_token_bucket_rejects_non_positive_refill_rate(refill_per_second):
+    with pytest.raises(ValueError):
+        TokenBucketLimiter(capacity=1, refill_per_second=refill_per_second)
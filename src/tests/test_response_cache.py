@@ -0,0 +1,84 @@
+import pytest
+from httpx import AsyncClient
+from src.services.user import response_cache
+from src.tests.conftest import TEST_USERNAME
+from src.utils.response_cache import ResponseCache
+
+
+def test_response_cache_budget_evicts_least_recently_used():
+    cache = ResponseCache(max_bytes=300, ttl_seconds=60)
+    cache.set('a', b'x' * 100, {}, {'user:a'}, cache.version)
+    cache.set('b', b'x' * 100, {}, {'user:b'}, cache.version)
+    cache.get('a')
+    cache.set('c', b'x' * 100, {}, {'user:c'}, cache.version)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.current_bytes <= 300
+    assert cache.stats()['evictions'] == 1
+
+    # Plus gros que le budget entier : jamais stocké
+    cache.set('d', b'x' * 400, {}, set(), cache.version)
+    assert cache.get('d') is None
+
+
+def test_response_cache_tags_and_stale_version():
+    cache = ResponseCache(max_bytes=10_000, ttl_seconds=60)
+    cache.set('page', b'[]', {}, {'users', 'user:a'}, cache.version)
+    cache.set('user', b'{}', {}, {'user:b'}, cache.version)
+
+    version = cache.version
+    cache.invalidate_tags(['user:a'])
+
+    assert cache.get('page') is None
+    assert cache.get('user') is not None
+    # Calculée avant l'invalidation : écartée
+    cache.set('page', b'[]', {}, {'users'}, version)
+    assert cache.get('page') is None
+    assert cache.stats()['bytes'] == len('user') + 2
+
+
+@pytest.mark.asyncio
+async def test_get_user_served_from_response_cache(
+    client: AsyncClient, initial_user, admin_headers: dict
+):
+    first = await client.get(f'/users/{TEST_USERNAME}')
+    hits = response_cache.hits
+    second = await client.get(f'/users/{TEST_USERNAME}')
+
+    assert second.content == first.content
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert response_cache.hits == hits + 1
+
+    response = await client.get(
+        f'/users/{TEST_USERNAME}', headers={'If-None-Match': first.headers['ETag']}
+    )
+    assert response.status_code == 304
+
+    await client.patch(
+        f'/users/{TEST_USERNAME}', json={'email': 'new@mail.com'}, headers=admin_headers
+    )
+    response = await client.get(f'/users/{TEST_USERNAME}')
+    assert response.json()['email'] == 'new@mail.com'
+
+
+@pytest.mark.asyncio
+async def test_user_list_cache_invalidated_by_create_and_delete(
+    client: AsyncClient, initial_user, admin_headers: dict
+):
+    response = await client.get('/users/')
+    assert len(response.json()) == 2
+
+    await client.post(
+        '/auth/register',
+        json={'username': 'other', 'email': 'other@mail.com', 'password': 'pw'},
+    )
+    response = await client.get('/users/')
+    assert len(response.json()) == 3
+
+    await client.delete('/users/other', headers=admin_headers)
+    response = await client.get('/users/')
+    assert [user['username'] for user in response.json()] == [
+        'admin',
+        TEST_USERNAME.lower(),
+    ]
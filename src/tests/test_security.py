@@ -0,0 +1,60 @@
+import pytest
+from src.tests.conftest import TEST_PASSWORD
+from src.utils.security import (
+    calibrate_bcrypt_rounds,
+    configure_password_context,
+    hash_password,
+    hash_password_async,
+    password_needs_rehash,
+    pwd_context,
+    shutdown_hash_pool,
+    start_hash_pool,
+    verify_password,
+    verify_password_async,
+)
+
+
+@pytest.mark.asyncio
+async def test_hash_password_async_without_pool():
+    hashed_password = await hash_password_async(TEST_PASSWORD)
+
+    assert hashed_password != TEST_PASSWORD
+    assert verify_password(TEST_PASSWORD, hashed_password)
+    assert await verify_password_async(TEST_PASSWORD, hashed_password)
+    assert not await verify_password_async('WrongPassword', hashed_password)
+
+
+@pytest.mark.asyncio
+async def test_hash_password_async_with_process_pool():
+    start_hash_pool(max_workers=1)
+    try:
+        hashed_password = await hash_password_async(TEST_PASSWORD)
+
+        assert await verify_password_async(TEST_PASSWORD, hashed_password)
+        assert not await verify_password_async('WrongPassword', hashed_password)
+    finally:
+        shutdown_hash_pool()
+
+
+def test_calibrate_bcrypt_rounds_stays_within_bounds():
+    assert calibrate_bcrypt_rounds(target_ms=0.001, min_rounds=4, max_rounds=6) == 4
+    assert calibrate_bcrypt_rounds(target_ms=10**9, min_rounds=4, max_rounds=6) == 6
+
+
+def test_configure_password_context_flags_old_cost():
+    old_hash = pwd_context.handler('bcrypt').using(rounds=4).hash(TEST_PASSWORD)
+    initial_config = pwd_context.to_dict()
+    try:
+        configure_password_context(5)
+        new_hash = hash_password(TEST_PASSWORD)
+
+        assert new_hash.startswith('$2b$05$')
+        assert password_needs_rehash(old_hash)
+        assert not password_needs_rehash(new_hash)
+        assert verify_password(TEST_PASSWORD, old_hash)
+        # Un hash plus fort n'est jamais rétrogradé
+        assert not password_needs_rehash(
+            pwd_context.handler('bcrypt').using(rounds=6).hash(TEST_PASSWORD)
+        )
+    finally:
+        pwd_context.load(initial_config)
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.models import User
+from src.db.slow_query import SlowQueryLogger, logger, normalize_sql
+from src.db.writer import WriteQueue
+from src.tests.conftest import TEST_USERNAME
+from src.utils.request_context import request_scope
+
+
+def test_normalize_sql_strips_values():
+    sql = normalize_sql(
+        "SELECT *\n  FROM users WHERE username = 'bob' AND rank > 1020"
+        ' AND uid IN (?, ?, ?) LIMIT ?'
+    )
+
+    assert sql == (
+        'SELECT * FROM users WHERE username = ? AND rank > ?'
+        ' AND uid IN (?, ...) LIMIT ?'
+    )
+    assert normalize_sql('SELECT ' + 'x, ' * 50, max_length=20).endswith('...')
+
+
+def test_slow_query_logger_rejects_invalid_sample_rate():
+    with pytest.raises(ValueError):
+        SlowQueryLogger(threshold_ms=100, sample_rate=1.5)
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log_names_the_route(
+    client: AsyncClient,
+    session: AsyncSession,
+    initial_user,
+    caplog: pytest.LogCaptureFixture,
+):
+    # Seuil nul : chaque requête est journalisée
+    SlowQueryLogger(threshold_ms=0).attach(session.bind, 'test')
+    logger.addHandler(caplog.handler)
+    try:
+        with caplog.at_level(logging.INFO, logger=logger.name):
+            await client.get(f'/users/{TEST_USERNAME}')
+    finally:
+        logger.removeHandler(caplog.handler)
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(
+        'route="GET /users/{username}"' in message and 'FROM users' in message
+        for message in messages
+    )
+    assert all(TEST_USERNAME.lower() not in message for message in messages)
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log_names_the_route_of_writer_units(
+    tmp_path, caplog: pytest.LogCaptureFixture
+):
+    engine = create_async_engine(f'sqlite+aiosqlite:///{tmp_path / "writer.sqlite"}')
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    SlowQueryLogger(threshold_ms=0).attach(engine, 'writer')
+    queue = WriteQueue(
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    await queue.start()
+
+    async def submit_from(path: str, username: str):
+        # La tâche du writer n'a pas de requête : la route vient du demandeur
+        request_scope.set({'method': 'POST', 'path': path})
+
+        async def unit(session: AsyncSession):
+            session.add(
+                User(username=username, email=f'{username}@x.com', hashed_password='h')
+            )
+            await session.flush()
+
+        await queue.submit(unit)
+
+    logger.addHandler(caplog.handler)
+    try:
+        with caplog.at_level(logging.INFO, logger=logger.name):
+            await asyncio.gather(
+                asyncio.create_task(submit_from('/auth/register', 'alice')),
+                asyncio.create_task(submit_from('/users/import', 'bob')),
+            )
+    finally:
+        logger.removeHandler(caplog.handler)
+        await queue.stop()
+        await engine.dispose()
+
+    inserts = [
+        record.getMessage()
+        for record in caplog.records
+        if 'INSERT INTO users' in record.getMessage()
+    ]
+    assert len(inserts) == 2
+    assert any('route="POST /auth/register"' in message for message in inserts)
+    assert any('route="POST /users/import"' in message for message in inserts)
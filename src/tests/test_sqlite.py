@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from src.db.sqlite import (
+    apply_sqlite_pragmas,
+    read_sqlite_pragmas,
+    resolve_sqlite_pragmas,
+)
+
+
+def test_resolve_sqlite_pragmas_applies_overrides():
+    pragmas = resolve_sqlite_pragmas(
+        'performance', {'synchronous': 'full', 'cache_size': None}
+    )
+
+    assert pragmas['synchronous'] == 'FULL'
+    assert pragmas['cache_size'] == -64_000
+    assert pragmas['foreign_keys'] == 'ON'
+
+
+def test_resolve_sqlite_pragmas_rejects_invalid_values():
+    with pytest.raises(ValueError):
+        resolve_sqlite_pragmas('unknown', {})
+    with pytest.raises(ValueError):
+        resolve_sqlite_pragmas('performance', {'journal_mode': 'WAL; DROP TABLE users'})
+
+
+@pytest.mark.asyncio
+async def test_sqlite_pragmas_applied_on_every_connection(tmp_path):
+    engine = create_async_engine(f'sqlite+aiosqlite:///{tmp_path / "pragmas.sqlite"}')
+    pragmas = resolve_sqlite_pragmas('performance', {})
+    apply_sqlite_pragmas(engine, pragmas)
+
+    # Deux connexions simultanées : chacune reçoit les PRAGMA
+    async with engine.connect() as first, engine.connect() as second:
+        for conn in (first, second):
+            result = await conn.exec_driver_sql('PRAGMA synchronous')
+            assert result.scalar() == 1  # NORMAL
+
+    effective = await read_sqlite_pragmas(engine)
+    await engine.dispose()
+
+    assert effective == {
+        'journal_mode': 'wal',
+        'synchronous': 'NORMAL',
+        'cache_size': -64_000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+        'foreign_keys': 'ON',
+    }
@@ -0,0 +1,65 @@
+import time
+
+import pytest
+from httpx import AsyncClient
+from src.tests.conftest import TEST_PASSWORD, TEST_USERNAME
+from src.utils.security import access_token_cache
+from src.utils.token_cache import TokenCache
+
+
+def test_token_cache_hit_and_miss():
+    cache = TokenCache(maxsize=2)
+    payload = {'sub': 'uid', 'exp': time.time() + 60}
+
+    assert cache.get('token') is None
+    cache.set('token', payload)
+
+    assert cache.get('token') == payload
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_token_cache_evicts_at_exp():
+    cache = TokenCache(maxsize=2)
+    exp = time.time() + 60
+    cache.set('token', {'sub': 'uid', 'exp': exp})
+
+    assert cache.get('token', now=exp - 1) is not None
+    assert cache.get('token', now=exp) is None
+    assert len(cache) == 0
+
+
+def test_token_cache_evicts_least_recently_used():
+    cache = TokenCache(maxsize=2)
+    exp = time.time() + 60
+    for token in ('a', 'b'):
+        cache.set(token, {'sub': token, 'exp': exp})
+    cache.get('a')
+    cache.set('c', {'sub': 'c', 'exp': exp})
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+
+
+def test_token_cache_ignores_tokens_without_exp():
+    cache = TokenCache(maxsize=2)
+    cache.set('token', {'sub': 'uid'})
+
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_protected_route_reuses_decoded_token(client: AsyncClient, initial_user):
+    response = await client.post(
+        '/auth/login',
+        data={'username': TEST_USERNAME, 'password': TEST_PASSWORD},
+    )
+    headers = {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+    first = await client.get('/auth/me', headers=headers)
+    hits = access_token_cache.hits
+    second = await client.get('/auth/me', headers=headers)
+
+    assert first.status_code == second.status_code == 202
+    assert access_token_cache.hits == hits + 1
@@ -1,12 +1,19 @@
+import csv
+import io
+import json
 import uuid
 from datetime import datetime
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
+from sqlmodel import delete, select, update
 from src.db.models import User
+from src.schemes.user import UserPublic
+from src.services.user_import import UserImportService
 from src.tests.conftest import TEST_EMAIL, TEST_PASSWORD, TEST_USERNAME
+from src.utils.pagination import encode_cursor
 from src.utils.security import verify_password
 
 
@@ -96,6 +103,49 @@ async def test_get_all_users_success(client: AsyncClient, initial_user):
     assert len(data) == 2
 
 
+@pytest.mark.asyncio
+async def test_get_all_users_paginated(client: AsyncClient, session: AsyncSession):
+    for i in range(5):
+        session.add(
+            User(
+                username=f'user{i}',
+                email=f'user{i}@mail.com',
+                hashed_password='hash',
+                rank=1337 if i % 2 else 1020,
+            )
+        )
+    await session.commit()
+
+    usernames = []
+    response = await client.get('/users/', params={'limit': 2})
+    while True:
+        assert response.status_code == 200
+        usernames.extend(user['username'] for user in response.json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            break
+        assert 'rel="next"' in response.headers['Link']
+        response = await client.get('/users/', params={'limit': 2, 'cursor': cursor})
+
+    assert usernames == [f'user{i}' for i in range(5)]
+
+    response = await client.get('/users/', params={'rank': 1337})
+    assert [user['username'] for user in response.json()] == ['user1', 'user3']
+    assert 'X-Next-Cursor' not in response.headers
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'cursor',
+    ['not-a-cursor', encode_cursor({'username': {'a': 1}}), encode_cursor({})],
+)
+async def test_get_all_users_invalid_cursor(client: AsyncClient, cursor):
+    response = await client.get('/users/', params={'cursor': cursor})
+
+    assert response.status_code == 400
+    assert response.json()['detail'] == 'Invalid cursor.'
+
+
 @pytest.mark.asyncio
 async def test_get_user_success(client: AsyncClient, initial_user):
     response = await client.get(f'/users/{TEST_USERNAME}')
@@ -106,6 +156,63 @@ async def test_get_user_success(client: AsyncClient, initial_user):
     assert data['username'] == TEST_USERNAME.lower()
 
 
+@pytest.mark.asyncio
+async def test_get_user_matches_public_schema(
+    client: AsyncClient, session: AsyncSession, initial_user
+):
+    response = await client.get(f'/users/{TEST_USERNAME}')
+    user = await session.get(User, TEST_USERNAME.lower())
+
+    assert response.headers['content-type'] == 'application/json'
+    assert response.json() == json.loads(
+        UserPublic.model_validate(user).model_dump_json()
+    )
+    assert 'hashed_password' not in response.json()
+
+
+@pytest.mark.asyncio
+async def test_get_user_conditional(
+    client: AsyncClient, initial_user, admin_headers: dict
+):
+    response = await client.get(f'/users/{TEST_USERNAME}')
+    etag = response.headers['ETag']
+
+    response = await client.get(
+        f'/users/{TEST_USERNAME}', headers={'If-None-Match': f'"other", W/{etag}'}
+    )
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert response.content == b''
+
+    response = await client.patch(
+        f'/users/{TEST_USERNAME}', json={'email': 'new@mail.com'}, headers=admin_headers
+    )
+    assert response.headers['ETag'] != etag
+
+    response = await client.get(
+        f'/users/{TEST_USERNAME}', headers={'If-None-Match': etag}
+    )
+    assert response.status_code == 200
+    assert response.json()['email'] == 'new@mail.com'
+
+
+@pytest.mark.asyncio
+async def test_get_all_users_conditional(client: AsyncClient, initial_user):
+    response = await client.get('/users/')
+    etag = response.headers['ETag']
+
+    response = await client.get('/users/', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+    await client.post(
+        '/auth/register',
+        json={'username': 'other', 'email': 'other@mail.com', 'password': 'pw'},
+    )
+    response = await client.get('/users/', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
 @pytest.mark.asyncio
 async def test_get_user_not_found(client: AsyncClient):
     response = await client.get(f'/users/{TEST_USERNAME}')
@@ -253,3 +360,304 @@ async def test_update_user_existing_email(client: AsyncClient, initial_user):
 
     assert response.status_code == 403
     assert data['detail'] == 'Email already exists.'
+
+
+@pytest.mark.asyncio
+async def test_export_users_ndjson_and_csv(
+    client: AsyncClient, session: AsyncSession, admin_headers, initial_user
+):
+    response = await client.get(
+        '/users/export', params={'format': 'ndjson'}, headers=admin_headers
+    )
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row['username'] for row in rows] == ['admin', TEST_USERNAME.lower()]
+    assert 'hashed_password' not in rows[0]
+
+    response = await client.get(
+        '/users/export', params={'format': 'csv'}, headers=admin_headers
+    )
+
+    assert response.status_code == 200
+    lines = list(csv.reader(io.StringIO(response.text)))
+    assert lines[0] == ['username', 'email', 'uid', 'created_at', 'updated_at', 'rank']
+    assert [line[0] for line in lines[1:]] == ['admin', TEST_USERNAME.lower()]
+
+
+@pytest.mark.asyncio
+async def test_export_users_requires_admin(client: AsyncClient, initial_user):
+    response = await client.get('/users/export')
+
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_import_users_ndjson_reports_row_errors(
+    client: AsyncClient, session: AsyncSession, admin_headers, initial_user
+):
+    lines = [
+        {'username': 'Imported1', 'email': 'imported1@mail.com', 'password': 'pw'},
+        {'username': 'imported2', 'email': 'imported2@mail.com', 'password': 'pw'},
+        {'username': TEST_USERNAME, 'email': 'other@mail.com', 'password': 'pw'},
+        {'username': 'imported1', 'email': 'again@mail.com', 'password': 'pw'},
+        {'username': 'imported3', 'email': 'imported3@mail.com'},
+    ]
+    body = '\n'.join(json.dumps(line) for line in lines) + '\nnot json\n'
+
+    response = await client.post('/users/import', content=body, headers=admin_headers)
+
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data['rows'] == 6
+    assert data['imported'] == 2
+    assert {error['line']: error['detail'] for error in data['errors']} == {
+        3: 'Username already exists.',
+        4: 'Duplicate username in import.',
+        5: 'password: Field required',
+        6: 'Invalid JSON.',
+    }
+    imported = await session.get(User, 'imported1')
+    assert verify_password('pw', imported.hashed_password)
+
+
+@pytest.mark.asyncio
+async def test_import_users_csv(
+    client: AsyncClient, session: AsyncSession, admin_headers
+):
+    body = (
+        'username,email,password\r\ncsv1,csv1@mail.com,pw\r\ncsv2,admin@mail.com,pw\r\n'
+    )
+
+    response = await client.post(
+        '/users/import', params={'format': 'csv'}, content=body, headers=admin_headers
+    )
+
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data['imported'] == 1
+    assert data['errors'] == [
+        {'line': 3, 'username': 'csv2', 'detail': 'Email already exists.'}
+    ]
+    assert await session.get(User, 'csv1') is not None
+
+
+@pytest.mark.asyncio
+async def test_import_users_csv_quoted_newlines(
+    client: AsyncClient, session: AsyncSession, admin_headers
+):
+    body = (
+        'username,email,password\n'
+        'bob,bob@mail.com,"pa\nss"\n'
+        'carol,carol@mail.com,pw\n'
+        'dan,dan@mail.com,"unterminated\n'
+    )
+
+    response = await client.post(
+        '/users/import', params={'format': 'csv'}, content=body, headers=admin_headers
+    )
+
+    data = response.json()
+
+    assert data['imported'] == 2
+    assert [(error['line'], error['detail'][:12]) for error in data['errors']] == [
+        (5, 'Invalid CSV:')
+    ]
+    bob = await session.get(User, 'bob')
+    assert verify_password('pa\nss', bob.hashed_password)
+    assert await session.get(User, 'carol') is not None
+
+
+@pytest.mark.asyncio
+async def test_import_users_applies_registration_rank(
+    client: AsyncClient, session: AsyncSession, admin_headers
+):
+    body = 'username,email,password\nFKaisin,fk@mail.com,pw\nplain,plain@mail.com,pw\n'
+
+    response = await client.post(
+        '/users/import', params={'format': 'csv'}, content=body, headers=admin_headers
+    )
+
+    assert response.json()['imported'] == 2
+    assert (await session.get(User, 'fkaisin')).rank == 1337
+    assert (await session.get(User, 'plain')).rank == 1020
+
+
+@pytest.mark.asyncio
+async def test_import_users_caps_reported_errors(session: AsyncSession):
+    async def chunks():
+        yield b'not json\n' * 5
+
+    data = await UserImportService(session, max_errors=2).import_users(
+        chunks(), 'ndjson'
+    )
+
+    assert data['failed'] == 5
+    assert [error['line'] for error in data['errors']] == [1, 2]
+    assert data['errors_truncated'] == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_update_users_rank(
+    client: AsyncClient, session: AsyncSession, admin_headers, initial_user
+):
+    response = await client.post(
+        '/users/batch/update',
+        json={'where': {'usernames': [TEST_USERNAME, 'ghost']}, 'rank': 1200},
+        headers=admin_headers,
+    )
+
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data['matched'] == 1
+    assert data['results'] == [
+        {'username': TEST_USERNAME.lower(), 'status': 'updated'},
+        {'username': 'ghost', 'status': 'not_found'},
+    ]
+    user = await session.get(User, TEST_USERNAME.lower())
+    assert user.rank == 1200
+
+
+@pytest.mark.asyncio
+async def test_batch_delete_users_by_filter(
+    client: AsyncClient, session: AsyncSession, admin_headers, initial_user
+):
+    response = await client.post(
+        '/users/batch/delete', json={'rank': 1020}, headers=admin_headers
+    )
+
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data['results'] == [{'username': TEST_USERNAME.lower(), 'status': 'deleted'}]
+    assert await session.get(User, TEST_USERNAME.lower()) is None
+    assert await session.get(User, 'admin') is not None
+
+
+@pytest.mark.asyncio
+async def test_batch_delete_users_reports_usernames_excluded_by_filters(
+    client: AsyncClient, session: AsyncSession, admin_headers, initial_user
+):
+    response = await client.post(
+        '/users/batch/delete',
+        json={'usernames': [TEST_USERNAME, 'admin', 'ghost'], 'rank': 1020},
+        headers=admin_headers,
+    )
+
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data['matched'] == 1
+    # admin existe mais n'a pas le rank demandé : distinct d'un username inconnu
+    assert data['results'] == [
+        {'username': TEST_USERNAME.lower(), 'status': 'deleted'},
+        {'username': 'admin', 'status': 'skipped'},
+        {'username': 'ghost', 'status': 'not_found'},
+    ]
+    assert await session.get(User, 'admin') is not None
+
+
+@pytest.mark.asyncio
+async def test_batch_delete_users_requires_a_criterion(
+    client: AsyncClient, admin_headers
+):
+    response = await client.post('/users/batch/delete', json={}, headers=admin_headers)
+
+    assert response.status_code == 400
+    assert response.json()['detail'] == 'At least one selection criterion is required.'
+
+
+@pytest.mark.asyncio
+async def test_search_users_by_prefix(
+    client: AsyncClient, session: AsyncSession, admin_headers
+):
+    for username, email in (
+        ('johnsmith', 'john.smith@gmail.com'),
+        ('johanna', 'jo@proton.me'),
+        ('alice', 'alice@gmail.com'),
+    ):
+        session.add(User(username=username, email=email, hashed_password='hash'))
+    await session.commit()
+
+    response = await client.get(
+        '/users/search', params={'q': 'joh'}, headers=admin_headers
+    )
+
+    assert response.status_code == 200
+    assert sorted(user['username'] for user in response.json()) == [
+        'johanna',
+        'johnsmith',
+    ]
+
+    response = await client.get(
+        '/users/search', params={'q': 'gmail', 'limit': 1}, headers=admin_headers
+    )
+    assert len(response.json()) == 1
+    response = await client.get(
+        '/users/search',
+        params={'q': 'gmail', 'limit': 1, 'cursor': response.headers['X-Next-Cursor']},
+        headers=admin_headers,
+    )
+    assert len(response.json()) == 1
+    assert 'X-Next-Cursor' not in response.headers
+
+    # Le trigger de suppression retire la ligne de l’index
+    await client.post(
+        '/users/batch/delete', json={'usernames': ['johanna']}, headers=admin_headers
+    )
+    response = await client.get(
+        '/users/search', params={'q': 'joh'}, headers=admin_headers
+    )
+    assert [user['username'] for user in response.json()] == ['johnsmith']
+
+
+@pytest.mark.asyncio
+async def test_search_users_survives_rowid_changes(
+    client: AsyncClient, session: AsyncSession, admin_headers
+):
+    for username in ('bernard', 'carla', 'denise'):
+        session.add(
+            User(username=username, email=f'{username}@x.com', hashed_password='hash')
+        )
+    await session.commit()
+    # Renumérote les rowid de users comme peut le faire un VACUUM
+    await session.execute(text('UPDATE users SET rowid = rowid + 1000'))
+    await session.execute(
+        update(User).where(User.username == 'carla').values(username='carlos')
+    )
+    await session.execute(delete(User).where(User.username == 'denise'))
+    await session.commit()
+
+    for query, expected in (('bern', ['bernard']), ('carl', ['carlos']), ('den', [])):
+        response = await client.get(
+            '/users/search', params={'q': query}, headers=admin_headers
+        )
+        assert [user['username'] for user in response.json()] == expected
+
+
+@pytest.mark.asyncio
+async def test_search_users_rejects_empty_query(client: AsyncClient, admin_headers):
+    response = await client.get(
+        '/users/search', params={'q': '" *'}, headers=admin_headers
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('offset', ['x', -1, True, None])
+async def test_search_users_rejects_invalid_cursor(
+    client: AsyncClient, admin_headers, offset
+):
+    response = await client.get(
+        '/users/search',
+        params={'q': 'john', 'cursor': encode_cursor({'offset': offset})},
+        headers=admin_headers,
+    )
+
+    assert response.status_code == 400
+    assert response.json()['detail'] == 'Invalid cursor.'
@@ -0,0 +1,136 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.db.models import User
+from src.schemes.user import UserUpdateAdmin
+from src.services.user import (
+    UserService,
+    response_cache,
+    user_cache,
+    warm_user_cache,
+)
+from src.tests.conftest import TEST_EMAIL, TEST_USERNAME
+from src.utils.user_cache import UserCache
+
+
+def make_user(username: str = 'cached') -> User:
+    return User(username=username, email=f'{username}@mail.com', hashed_password='x')
+
+
+def test_user_cache_indexed_by_username_and_uid():
+    cache = UserCache(maxsize=10, ttl_seconds=60)
+    user = make_user()
+    cache.set(user, cache.version)
+
+    by_username = cache.get_by_username('cached')
+    by_uid = cache.get_by_uid(user.uid)
+
+    assert by_username.uid == by_uid.uid == user.uid
+    # Chaque lecture renvoie une copie détachée
+    assert by_username is not user
+    assert cache.get_by_uid(uuid.uuid4()) is None
+    assert cache.stats()['hits'] == 2
+    assert cache.stats()['misses'] == 1
+
+
+def test_user_cache_ttl_and_capacity():
+    cache = UserCache(maxsize=1, ttl_seconds=0)
+    cache.set(make_user(), cache.version)
+
+    assert cache.get_by_username('cached') is None
+    assert len(cache) == 0
+
+    cache = UserCache(maxsize=1, ttl_seconds=60)
+    first, second = make_user('first'), make_user('second')
+    cache.set(first, cache.version)
+    cache.set(second, cache.version)
+
+    assert cache.get_by_uid(first.uid) is None
+    assert cache.get_by_uid(second.uid) is not None
+
+
+def test_user_cache_invalidate_by_uid_after_rename():
+    cache = UserCache(maxsize=10, ttl_seconds=60)
+    user = make_user('old')
+    cache.set(user, cache.version)
+
+    cache.invalidate(username='new', uid=user.uid)
+
+    assert cache.get_by_username('old') is None
+    assert len(cache) == 0
+
+
+def test_user_cache_skips_rows_read_before_an_invalidation():
+    cache = UserCache(maxsize=10, ttl_seconds=60)
+    user = make_user()
+
+    version = cache.version
+    cache.invalidate(username=user.username)
+    cache.set(user, version)
+
+    assert cache.get_by_username('cached') is None
+    cache.set(user, cache.version)
+    assert cache.get_by_username('cached') is not None
+
+
+@pytest.mark.asyncio
+async def test_get_user_does_not_cache_a_row_overtaken_by_a_write(
+    client: AsyncClient,
+    session: AsyncSession,
+    initial_user,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    user_cache.clear()
+    session_get = session.get
+
+    async def get_then_write(*args, **kwargs):
+        # Une écriture et son invalidation passent pendant la lecture
+        row = await session_get(*args, **kwargs)
+        user_cache.invalidate(username=TEST_USERNAME.lower())
+        return row
+
+    monkeypatch.setattr(session, 'get', get_then_write)
+    await UserService(session).get_user(TEST_USERNAME)
+
+    assert user_cache.get_by_username(TEST_USERNAME.lower()) is None
+
+
+@pytest.mark.asyncio
+async def test_get_user_reads_through_cache(client: AsyncClient, initial_user):
+    first = await client.get(f'/users/{TEST_USERNAME}')
+    # Sans le cache de réponses, la route relit l'utilisateur
+    response_cache.clear()
+    hits = user_cache.hits
+    second = await client.get(f'/users/{TEST_USERNAME}')
+
+    assert first.json() == second.json()
+    assert user_cache.hits == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_update_user_admin_invalidates_renamed_user(
+    client: AsyncClient, session: AsyncSession, initial_user
+):
+    user = await UserService(session).get_user(TEST_USERNAME)
+    assert user_cache.get_by_uid(user.uid) is not None
+
+    await UserService(session).update_user_admin(
+        TEST_USERNAME, UserUpdateAdmin(username='renamed')
+    )
+
+    assert user_cache.get_by_username(TEST_USERNAME.lower()) is None
+    renamed = await UserService(session).get_user_by_uid(user.uid)
+    assert renamed.username == 'renamed'
+    assert renamed.email == TEST_EMAIL.lower()
+
+
+@pytest.mark.asyncio
+async def test_warm_user_cache(
+    client: AsyncClient, session: AsyncSession, initial_user
+):
+    user_cache.clear()
+
+    assert await warm_user_cache(session) == 1
+    assert user_cache.get_by_username(TEST_USERNAME.lower()) is not None
@@ -0,0 +1,125 @@
+import asyncio
+import sqlite3
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.models import User
+from src.db.sqlite import apply_sqlite_pragmas, use_explicit_transactions
+from src.db.writer import WriteQueue, run_write
+
+
+def make_user(username: str) -> User:
+    return User(username=username, email=f'{username}@mail.com', hashed_password='hash')
+
+
+@pytest.mark.asyncio
+async def test_write_queue_group_commit_isolates_failing_units(tmp_path):
+    engine = create_async_engine(f'sqlite+aiosqlite:///{tmp_path / "writer.sqlite"}')
+    use_explicit_transactions(engine, begin='BEGIN IMMEDIATE')
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    queue = WriteQueue(session_factory)
+    await queue.start()
+
+    def insert(username: str):
+        async def unit(session: AsyncSession) -> str:
+            session.add(make_user(username))
+            await session.flush()
+            return username
+
+        return unit
+
+    async def failing(session: AsyncSession):
+        session.add(make_user('user0'))
+        await session.flush()
+
+    results = await asyncio.gather(
+        *(queue.submit(insert(f'user{i}')) for i in range(10)),
+        queue.submit(failing),
+        return_exceptions=True,
+    )
+    stats = queue.stats()
+    await queue.stop()
+
+    async with session_factory() as session:
+        usernames = (await session.exec(select(User.username))).all()
+    await engine.dispose()
+
+    assert results[:10] == [f'user{i}' for i in range(10)]
+    assert isinstance(results[10], Exception)
+    assert sorted(usernames) == sorted(f'user{i}' for i in range(10))
+    assert stats['units'] == 11
+    assert stats['failed_units'] == 1
+    assert stats['batches'] < 11
+
+
+@pytest.mark.asyncio
+async def test_write_queue_commits_a_batch_at_once(tmp_path):
+    path = tmp_path / 'writer.sqlite'
+    engine = create_async_engine(f'sqlite+aiosqlite:///{path}')
+    use_explicit_transactions(engine, begin='BEGIN IMMEDIATE')
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    queue = WriteQueue(
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    await queue.start()
+
+    def count_committed_users() -> int:
+        # Autre connexion : ne voit que ce qui est commité
+        with sqlite3.connect(path) as conn:
+            return conn.execute('SELECT count(*) FROM users').fetchone()[0]
+
+    async def first(session: AsyncSession):
+        session.add(make_user('first'))
+        await session.flush()
+
+    async def second(session: AsyncSession) -> int:
+        return count_committed_users()
+
+    _, visible_during_batch = await asyncio.gather(
+        queue.submit(first), queue.submit(second)
+    )
+    stats = queue.stats()
+    await queue.stop()
+    await engine.dispose()
+
+    assert stats['batches'] == 1
+    assert visible_during_batch == 0
+    assert count_committed_users() == 1
+
+
+@pytest.mark.asyncio
+async def test_run_write_falls_back_to_caller_session(session: AsyncSession):
+    async def unit(session: AsyncSession) -> User:
+        user = make_user('inline')
+        session.add(user)
+        return user
+
+    user = await run_write(session, unit, queue=WriteQueue(None))
+
+    assert await session.get(User, 'inline') is user
+
+
+@pytest.mark.asyncio
+async def test_read_only_connections_refuse_writes(tmp_path):
+    engine = create_async_engine(f'sqlite+aiosqlite:///{tmp_path / "read.sqlite"}')
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    await engine.dispose()
+
+    apply_sqlite_pragmas(engine, {'query_only': 'ON'})
+    with pytest.raises(OperationalError, match='readonly'):
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql(
+                'INSERT INTO users (username, email, uid, hashed_password, rank, '
+                "created_at, updated_at) VALUES ('ro', 'ro@mail.com', 'x', 'h', 1, "
+                "'2026-01-01', '2026-01-01')"
+            )
+    await engine.dispose()
@@ -0,0 +1,110 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, status
+
+
+class AdmissionLimiter:
+    """
+    Concurrency limiter with a bounded FIFO wait queue.
+
+    When every slot is busy and the queue is full, new callers are rejected at
+    once with a 503 and a Retry-After computed from the queue depth and the
+    average service time, instead of piling up until they time out.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, name: str = 'limiter'):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        # Moyenne glissante du temps de service, pour estimer le Retry-After
+        self.avg_service_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        pending = self.queue_depth + 1
+        return max(
+            1, math.ceil(pending * self.avg_service_seconds / self.max_concurrency)
+        )
+
+    async def acquire(self) -> float:
+        start = time.perf_counter()
+
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+        elif len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail='Server busy, please retry later.',
+                headers={'Retry-After': str(self.retry_after())},
+            )
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                # release() transfère directement son slot au premier en attente
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self.release()
+                else:
+                    self._waiters.remove(waiter)
+                raise
+
+        waited = time.perf_counter() - start
+        self.admitted += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return waited
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if self.avg_service_seconds:
+                self.avg_service_seconds += 0.2 * (elapsed - self.avg_service_seconds)
+            else:
+                self.avg_service_seconds = elapsed
+            self.release()
+
+    def stats(self) -> dict:
+        return {
+            'name': self.name,
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'active': self.active,
+            'queue_depth': self.queue_depth,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'avg_wait_seconds': (
+                self.total_wait_seconds / self.admitted if self.admitted else 0.0
+            ),
+            'max_wait_seconds': self.max_wait_seconds,
+            'avg_service_seconds': self.avg_service_seconds,
+        }
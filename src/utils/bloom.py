@@ -0,0 +1,53 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    `item in bloom` is False only if the item was never added; True means
+    "maybe", so a positive answer must be confirmed against the source of truth.
+    Items cannot be removed: rebuild the filter with clear() + add() instead.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(
+            8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray(math.ceil(self.num_bits / 8))
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Double hachage (Kirsch-Mitzenmacher) à partir d'un seul digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def clear(self) -> None:
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
+
+    def stats(self) -> dict:
+        return {
+            'capacity': self.capacity,
+            'count': self.count,
+            'num_bits': self.num_bits,
+            'num_hashes': self.num_hashes,
+            'size_bytes': len(self._bits),
+        }
@@ -20,9 +20,16 @@ async def check_username_or_email_exists(
                     'email already exists' if the email exists,
                     None if neither exists.
     """
-    user = await session.exec(
-        select(User).where(or_(User.username == username, User.email == email))
-    )
+    # Un critère absent deviendrait `IS NULL` et forcerait un scan de la table
+    conditions = []
+    if username is not None:
+        conditions.append(User.username == username)
+    if email is not None:
+        conditions.append(User.email == email)
+    if not conditions:
+        return None
+
+    user = await session.exec(select(User).where(or_(*conditions)))
     result = user.first()
 
     if not result:
@@ -31,3 +38,35 @@ async def check_username_or_email_exists(
         return 'Username already exists.'
     else:
         return 'Email already exists.'
+
+
+async def find_existing_users(
+    session: AsyncSession, usernames: set[str], emails: set[str]
+) -> tuple[set[str], set[str]]:
+    """
+    Find which usernames and emails are already taken, in a single query.
+
+    Args:
+        session (AsyncSession): The database session.
+        usernames (set[str]): The usernames to check.
+        emails (set[str]): The emails to check.
+
+    Returns:
+        tuple[set[str], set[str]]: The taken usernames and the taken emails.
+    """
+    conditions = []
+    if usernames:
+        conditions.append(User.username.in_(usernames))
+    if emails:
+        conditions.append(User.email.in_(emails))
+    if not conditions:
+        return set(), set()
+
+    result = await session.exec(
+        select(User.username, User.email).where(or_(*conditions))
+    )
+    rows = result.all()
+    return (
+        {row.username for row in rows} & usernames,
+        {row.email for row in rows} & emails,
+    )
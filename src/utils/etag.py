@@ -0,0 +1,50 @@
+import hashlib
+import json
+from collections.abc import Iterable
+
+from fastapi import Request, Response, status
+
+
+def user_etag(user) -> str:
+    # updated_at change à chaque écriture (onupdate) : uid + updated_at suffit
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(user.uid.bytes)
+    digest.update(user.updated_at.isoformat().encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def users_etag(users: Iterable, position: dict | None = None) -> str:
+    """
+    Build the validator of a page of users.
+
+    Args:
+        users (Iterable): The users of the page, in their response order.
+        position (dict | None): The next page position, part of the response.
+
+    Returns:
+        str: A strong ETag that changes when a row of the page is updated,
+            added, removed or reordered.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for user in users:
+        digest.update(user.uid.bytes)
+        digest.update(user.updated_at.isoformat().encode())
+    digest.update(json.dumps(position, separators=(',', ':')).encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    # If-None-Match se compare en mode faible (RFC 9110) : le préfixe W/ est ignoré
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return any(
+        candidate.strip().removeprefix('W/') == etag for candidate in header.split(',')
+    )
+
+
+def not_modified(headers: dict) -> Response:
+    # Mêmes en-têtes de validation que la réponse 200, sans corps à sérialiser
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
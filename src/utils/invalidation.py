@@ -0,0 +1,180 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from collections.abc import Callable
+
+from src.config import settings
+
+EventHandler = Callable[[dict], None]
+
+
+class InvalidationBus(ABC):
+    """
+    Publish/subscribe bus for cache invalidation events between workers.
+
+    Handlers are synchronous and run in every worker, including the publishing
+    one, which applies its own events immediately. A backend only has to ship
+    (kind, payload) pairs to the other workers and call apply() on receipt;
+    a Redis pub/sub backend would implement _send() and start()/stop().
+    """
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._handlers: dict[str, list[EventHandler]] = defaultdict(list)
+
+        self.published = 0
+        self.received = 0
+
+    def subscribe(self, kind: str, handler: EventHandler) -> None:
+        self._handlers[kind].append(handler)
+
+    def unsubscribe(self, kind: str, handler: EventHandler) -> None:
+        self._handlers[kind].remove(handler)
+
+    def apply(self, kind: str, payload: dict) -> None:
+        for handler in self._handlers.get(kind, ()):
+            try:
+                handler(payload)
+            except Exception as exc:
+                print(f'❌ Invalidation {kind} échouée :', exc)
+
+    async def publish(self, kind: str, payload: dict) -> None:
+        self.published += 1
+        self.apply(kind, payload)
+        await self._send(kind, payload)
+
+    @abstractmethod
+    async def _send(self, kind: str, payload: dict) -> None: ...
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {
+            'backend': type(self).__name__,
+            'origin': self.origin,
+            'published': self.published,
+            'received': self.received,
+        }
+
+
+class LocalInvalidationBus(InvalidationBus):
+    # Un seul worker : l'application locale suffit
+    async def _send(self, kind: str, payload: dict) -> None:
+        pass
+
+
+class SQLiteInvalidationBus(InvalidationBus):
+    """
+    Bus backed by a shared SQLite file that every worker polls.
+
+    Needs no external server: workers on the same host append events to a
+    table and read the rows they have not seen yet every poll interval.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        poll_interval_seconds: float = 0.5,
+        retention_seconds: float = 3600,
+    ):
+        super().__init__()
+        self.path = path
+        self.poll_interval_seconds = poll_interval_seconds
+        self.retention_seconds = retention_seconds
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._task: asyncio.Task | None = None
+
+    def _execute(self, sql: str, parameters: tuple = ()) -> list[tuple]:
+        with self._lock:
+            if self._connection is None:
+                self._connection = sqlite3.connect(
+                    self.path, check_same_thread=False, isolation_level=None
+                )
+                self._connection.execute('PRAGMA journal_mode=WAL')
+                self._connection.execute('PRAGMA busy_timeout=5000')
+                self._connection.execute(
+                    'CREATE TABLE IF NOT EXISTS invalidation_events ('
+                    'id INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT NOT NULL, '
+                    'kind TEXT NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL)'
+                )
+            return self._connection.execute(sql, parameters).fetchall()
+
+    async def _send(self, kind: str, payload: dict) -> None:
+        await asyncio.to_thread(
+            self._execute,
+            'INSERT INTO invalidation_events (origin, kind, payload, created_at) '
+            'VALUES (?, ?, ?, ?)',
+            (self.origin, kind, json.dumps(payload), time.time()),
+        )
+
+    async def poll(self) -> int:
+        rows = await asyncio.to_thread(
+            self._execute,
+            'SELECT id, origin, kind, payload FROM invalidation_events '
+            'WHERE id > ? ORDER BY id',
+            (self._last_id,),
+        )
+        for event_id, origin, kind, payload in rows:
+            self._last_id = event_id
+            if origin != self.origin:
+                self.received += 1
+                self.apply(kind, json.loads(payload))
+        return len(rows)
+
+    async def _poll_periodically(self) -> None:
+        last_cleanup = time.monotonic()
+        while True:
+            await asyncio.sleep(self.poll_interval_seconds)
+            try:
+                await self.poll()
+                if time.monotonic() - last_cleanup >= self.retention_seconds:
+                    await asyncio.to_thread(
+                        self._execute,
+                        'DELETE FROM invalidation_events WHERE created_at < ?',
+                        (time.time() - self.retention_seconds,),
+                    )
+                    last_cleanup = time.monotonic()
+            except Exception as exc:
+                print('❌ Lecture du bus d’invalidation échouée :', exc)
+
+    async def start(self) -> None:
+        # Les événements antérieurs au démarrage ne concernent pas ce worker
+        rows = await asyncio.to_thread(
+            self._execute, 'SELECT COALESCE(MAX(id), 0) FROM invalidation_events'
+        )
+        self._last_id = rows[0][0]
+        self._task = asyncio.create_task(self._poll_periodically())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def create_invalidation_bus(backend: str = settings.INVALIDATION_BACKEND):
+    if backend == 'local':
+        return LocalInvalidationBus()
+    if backend == 'sqlite':
+        return SQLiteInvalidationBus(
+            path=settings.INVALIDATION_SQLITE_PATH,
+            poll_interval_seconds=settings.INVALIDATION_POLL_INTERVAL_SECONDS,
+        )
+    raise ValueError(f'Unknown invalidation backend: {backend}')
+
+
+invalidation_bus = create_invalidation_bus()
@@ -0,0 +1,127 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from calendar import timegm
+from datetime import datetime
+
+import jwt
+
+HMAC_DIGESTS = {
+    'HS256': hashlib.sha256,
+    'HS384': hashlib.sha384,
+    'HS512': hashlib.sha512,
+}
+# Claims validés par PyJWT que le chemin rapide ne sait pas vérifier
+FALLBACK_CLAIMS = frozenset({'nbf', 'iat', 'aud', 'iss'})
+
+
+def base64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def base64url_decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b'=' * (-len(data) % 4))
+
+
+class TokenCodec:
+    """
+    JWT encoder/decoder specialised for one HS* algorithm and key.
+
+    The encoded header and the keyed HMAC are computed once; each token then
+    costs one JSON dump/load, one HMAC copy and one digest. Tokens are
+    byte-for-byte identical to PyJWT's. Anything the fast path does not handle
+    (other algorithms, unexpected headers, nbf/iat/aud/iss claims) goes
+    through PyJWT, so errors and validation rules stay the same.
+    """
+
+    def __init__(self, key: str, algorithm: str):
+        self.key = key
+        self.algorithm = algorithm
+        self._mac = None
+        self._header = b''
+
+        digestmod = HMAC_DIGESTS.get(algorithm)
+        if digestmod is not None:
+            self._mac = hmac.new(key.encode(), digestmod=digestmod)
+            self._header = base64url_encode(
+                json.dumps(
+                    {'alg': algorithm, 'typ': 'JWT'},
+                    separators=(',', ':'),
+                    sort_keys=True,
+                ).encode()
+            )
+
+    @property
+    def fast_path(self) -> bool:
+        return self._mac is not None
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def encode(self, payload: dict) -> str:
+        if self._mac is None:
+            return jwt.encode(payload=payload, key=self.key, algorithm=self.algorithm)
+
+        payload = payload.copy()
+        for claim in ('exp', 'iat', 'nbf'):
+            if isinstance(payload.get(claim), datetime):
+                payload[claim] = timegm(payload[claim].utctimetuple())
+
+        signing_input = (
+            self._header
+            + b'.'
+            + base64url_encode(json.dumps(payload, separators=(',', ':')).encode())
+        )
+        signature = base64url_encode(self._sign(signing_input))
+        return (signing_input + b'.' + signature).decode()
+
+    def _decode_with_pyjwt(self, token: str) -> dict:
+        return jwt.decode(token, key=self.key, algorithms=[self.algorithm])
+
+    def decode(self, token: str) -> dict:
+        if self._mac is None:
+            return self._decode_with_pyjwt(token)
+
+        token_bytes = token.encode()
+        try:
+            signing_input, crypto_segment = token_bytes.rsplit(b'.', 1)
+            header_segment, payload_segment = signing_input.split(b'.', 1)
+        except ValueError:
+            return self._decode_with_pyjwt(token)
+
+        if header_segment != self._header:
+            return self._decode_with_pyjwt(token)
+
+        try:
+            signature = base64url_decode(crypto_segment)
+        except (TypeError, binascii.Error):
+            raise jwt.DecodeError('Invalid crypto padding')
+        if not hmac.compare_digest(signature, self._sign(signing_input)):
+            raise jwt.InvalidSignatureError('Signature verification failed')
+
+        try:
+            payload = json.loads(base64url_decode(payload_segment))
+        except (TypeError, ValueError, binascii.Error):
+            raise jwt.DecodeError('Invalid payload padding')
+        if not isinstance(payload, dict):
+            raise jwt.DecodeError('Invalid payload string: must be a json object')
+
+        if not FALLBACK_CLAIMS.isdisjoint(payload) or not all(
+            isinstance(payload.get(claim, ''), str) for claim in ('sub', 'jti')
+        ):
+            return self._decode_with_pyjwt(token)
+
+        if 'exp' in payload:
+            try:
+                exp = int(payload['exp'])
+            except (TypeError, ValueError):
+                raise jwt.DecodeError('Expiration Time claim (exp) must be an integer.')
+            if exp <= time.time():
+                raise jwt.ExpiredSignatureError('Signature has expired')
+
+        return payload
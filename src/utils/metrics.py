@@ -0,0 +1,245 @@
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+from math import inf
+
+# Secondes : de 0,5 ms (requête SQLite, cache) à 10 s (bcrypt sous charge)
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+Collector = Callable[[], list[str]]
+
+
+def _format_value(value: float) -> str:
+    if value == inf:
+        return '+Inf'
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ''
+    pairs = (f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + ','.join(pairs) + '}'
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} counter',
+        ]
+        for labelvalues, value in self._values.items():
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f'{self.name}{labels} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    """
+    Histogram with fixed buckets, one series per label combination.
+
+    observe() is a bisect and three additions on the event loop thread: no
+    lock, no allocation once the series exists. Buckets are counted
+    individually and only made cumulative when rendered.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [compteurs par bucket (+Inf en dernier), somme, nombre]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labelvalues) -> None:
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        bucket_labelnames = (*self.labelnames, 'le')
+        for labelvalues, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, inf), counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    bucket_labelnames, (*labelvalues, _format_value(bound))
+                )
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Metrics rendered in the Prometheus text exposition format (version 0.0.4).
+
+    Counters and histograms are updated in place by the instrumented code;
+    collectors are called at scrape time and turn existing stats() dicts
+    into gauges, so they cost nothing between two scrapes.
+    """
+
+    def __init__(self):
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[Collector] = []
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+
+def stats_gauges(
+    prefix: str, label: str, stats: dict[str, dict], documentation: str
+) -> list[str]:
+    """
+    Turn stats() dicts into gauges, one per numeric field.
+
+    Args:
+        prefix (str): The metric name prefix, e.g. 'app_db_pool'.
+        label (str): The label that tells the dicts apart, e.g. 'pool'.
+        stats (dict[str, dict]): The stats() dicts by label value. Nested
+            dicts are flattened with '_'; strings are skipped.
+        documentation (str): The HELP text shared by the gauges.
+
+    Returns:
+        list[str]: The exposition lines.
+    """
+    samples: dict[str, list[str]] = {}
+
+    def collect(label_value: str, name: str, data: dict) -> None:
+        for field, value in data.items():
+            if isinstance(value, dict):
+                collect(label_value, f'{name}_{field}', value)
+            elif isinstance(value, int | float):
+                labels = _format_labels((label,), (label_value,))
+                samples.setdefault(f'{name}_{field}', []).append(
+                    f'{name}_{field}{labels} {_format_value(value)}'
+                )
+
+    for label_value, data in stats.items():
+        collect(label_value, prefix, data)
+
+    lines = []
+    for name, metric_samples in samples.items():
+        lines.append(f'# HELP {name} {documentation}')
+        lines.append(f'# TYPE {name} gauge')
+        lines.extend(metric_samples)
+    return lines
+
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.counter(
+    'http_requests_total',
+    'HTTP requests by method, route template and status code.',
+    ('method', 'route', 'status'),
+)
+http_request_duration_seconds = registry.histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency by method and route template, body sent included.',
+    ('method', 'route'),
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request.
+
+    Requests are labelled with their route template (e.g. /users/{username})
+    read from the scope once routing is done, so the label cardinality stays
+    bounded; requests that match no route share the 'unmatched' label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get('route')
+            route_path = getattr(route, 'path', 'unmatched')
+            method = scope['method']
+            http_requests_total.inc(method, route_path, str(status_code))
+            http_request_duration_seconds.observe(
+                time.perf_counter() - start, method, route_path
+            )
@@ -0,0 +1,59 @@
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException, Request, status
+
+
+def encode_cursor(position: dict) -> str:
+    # Curseur opaque pour le client : position encodée en base64url
+    data = json.dumps(position, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor: str, **fields: type) -> dict:
+    """
+    Decode a cursor built by encode_cursor.
+
+    The cursor comes from the client: its fields are checked before they
+    reach a query, and any mismatch is a 400 rather than a driver error.
+
+    Args:
+        cursor (str): The opaque cursor sent back by the client.
+        **fields (type): The type of each required field, e.g. offset=int.
+            Integers are offsets and must not be negative.
+
+    Returns:
+        dict: The position of the last row of the previous page.
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        position = json.loads(data)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        position = None
+
+    if not isinstance(position, dict) or not all(
+        _valid_field(position.get(name), field_type)
+        for name, field_type in fields.items()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Invalid cursor.',
+        )
+    return position
+
+
+def _valid_field(value, field_type: type) -> bool:
+    # type() exact : True n'est pas un décalage, même si bool hérite de int
+    if type(value) is not field_type:
+        return False
+    return field_type is not int or value >= 0
+
+
+def next_page_headers(request: Request, position: dict | None) -> dict:
+    # Page suivante annoncée dans les en-têtes : le corps reste une simple liste
+    if position is None:
+        return {}
+    next_cursor = encode_cursor(position)
+    next_url = request.url.include_query_params(cursor=next_cursor)
+    return {'X-Next-Cursor': next_cursor, 'Link': f'<{next_url}>; rel="next"'}
@@ -0,0 +1,99 @@
+import math
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """
+    In-process token bucket rate limiter keyed by an arbitrary string.
+
+    Memory is bounded: buckets are kept in LRU order and the least recently
+    used one is dropped past max_keys. Buckets that have refilled completely
+    carry no information and are evicted by a periodic sweep.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_per_second: float,
+        max_keys: int = 100_000,
+        sweep_interval_seconds: float = 60,
+        name: str = 'limiter',
+    ):
+        # Un débit nul ne rendrait jamais de jeton : Retry-After et purge infinis
+        if refill_per_second <= 0:
+            raise ValueError(
+                f'Refill rate must be positive, got {refill_per_second} for {name}.'
+            )
+        self.name = name
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self.sweep_interval_seconds = sweep_interval_seconds
+        # clé -> (jetons restants, horodatage de la dernière mise à jour)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._last_sweep = time.monotonic()
+
+        self.allowed = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def consume(self, key: str, now: float | None = None) -> float:
+        """
+        Take one token from the bucket of a key.
+
+        Args:
+            key (str): The key to rate limit (IP, username...).
+            now (float | None): Monotonic time, mostly for tests.
+
+        Returns:
+            float: 0 if the call is allowed, otherwise the number of seconds
+                   to wait before a token is available.
+        """
+        now = time.monotonic() if now is None else now
+        if now - self._last_sweep >= self.sweep_interval_seconds:
+            self._sweep(now)
+
+        tokens, updated_at = self._buckets.pop(key, (self.capacity, now))
+        tokens = min(
+            self.capacity, tokens + (now - updated_at) * self.refill_per_second
+        )
+
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            retry_after = 0.0
+            self.allowed += 1
+        else:
+            self._buckets[key] = (tokens, now)
+            retry_after = (1 - tokens) / self.refill_per_second
+            self.rejected += 1
+
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def _sweep(self, now: float) -> None:
+        # Un bucket plein équivaut à une clé jamais vue : on peut l'oublier
+        full_after = self.capacity / self.refill_per_second
+        for key, (tokens, updated_at) in list(self._buckets.items()):
+            if now - updated_at >= full_after:
+                del self._buckets[key]
+        self._last_sweep = now
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+    def stats(self) -> dict:
+        return {
+            'name': self.name,
+            'keys': len(self._buckets),
+            'max_keys': self.max_keys,
+            'allowed': self.allowed,
+            'rejected': self.rejected,
+        }
+
+
+def retry_after_header(seconds: float) -> dict:
+    return {'Retry-After': str(max(1, math.ceil(seconds)))}
@@ -0,0 +1,40 @@
+from contextvars import ContextVar
+
+# Scope ASGI de la requête en cours ; la route n'y est ajoutée qu'après le routage
+request_scope: ContextVar[dict | None] = ContextVar('request_scope', default=None)
+
+
+def current_route() -> str | None:
+    """
+    Describe the HTTP route being served by the current task.
+
+    SQLAlchemy runs the DBAPI calls of an AsyncSession in a greenlet that
+    shares the context of the awaiting task, so this also works from
+    engine event hooks. The writer task restores the scope of the request
+    that queued each unit; other tasks outside a request (purge) get None.
+
+    Returns:
+        str | None: The method and route template, e.g. 'GET /users/{username}'.
+    """
+    scope = request_scope.get()
+    if scope is None:
+        return None
+    route = scope.get('route')
+    return f'{scope["method"]} {getattr(route, "path", scope["path"])}'
+
+
+class RequestContextMiddleware:
+    # ASGI pur : la variable est posée dans la tâche qui exécute la route
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        token = request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope.reset(token)
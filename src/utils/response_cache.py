@@ -0,0 +1,157 @@
+import time
+from collections import OrderedDict, defaultdict
+from typing import NamedTuple
+
+from fastapi import Request, Response, status
+from src.utils.etag import etag_matches
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: dict[str, str]
+    tags: frozenset[str]
+    size: int
+    expires_at: float
+
+    def response(self, request: Request) -> Response:
+        # Le validateur est stocké avec le corps : un 304 ne coûte qu'une comparaison
+        if 'ETag' in self.headers and etag_matches(request, self.headers['ETag']):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers
+            )
+        return Response(
+            content=self.body, headers=self.headers, media_type='application/json'
+        )
+
+
+class ResponseCache:
+    """
+    LRU cache of encoded response bodies, bounded by a memory budget.
+
+    Entries are keyed by host, path and sorted query parameters, and carry
+    tags (e.g. the usernames they contain) used for targeted invalidation.
+    A response computed while an invalidation happened is not stored, so a
+    read racing a write cannot put stale bytes back in the cache.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float, name: str = 'response'):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._tag_index: dict[str, set[str]] = defaultdict(set)
+        self.current_bytes = 0
+        # Incrémenté à chaque invalidation : les réponses calculées avant sont écartées
+        self.version = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(request: Request) -> str:
+        query = '&'.join(
+            f'{name}={value}'
+            for name, value in sorted(request.query_params.multi_items())
+        )
+        return f'{request.url.netloc}{request.url.path}?{query}'
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            if entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self._remove(key)
+
+        self.misses += 1
+        return None
+
+    def set(
+        self,
+        key: str,
+        body: bytes,
+        headers: dict[str, str],
+        tags: set[str],
+        version: int,
+    ) -> None:
+        """
+        Store an encoded response unless it may already be stale.
+
+        Args:
+            key (str): The key built by ResponseCache.key().
+            body (bytes): The encoded JSON body.
+            headers (dict[str, str]): The headers sent with the body.
+            tags (set[str]): The tags that invalidate this entry.
+            version (int): The cache version read before querying the database.
+        """
+        size = (
+            len(key)
+            + len(body)
+            + sum(map(len, headers))
+            + sum(map(len, headers.values()))
+        )
+        if version != self.version or size > self.max_bytes:
+            return
+
+        self._remove(key)
+        self._entries[key] = CachedResponse(
+            body=body,
+            headers=headers,
+            tags=frozenset(tags),
+            size=size,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        self.current_bytes += size
+        for tag in tags:
+            self._tag_index[tag].add(key)
+
+        while self.current_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate_tags(self, tags: list[str]) -> None:
+        self.version += 1
+        for tag in tags:
+            for key in list(self._tag_index.get(tag, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.current_bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def clear(self) -> None:
+        self.version += 1
+        self._entries.clear()
+        self._tag_index.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'name': self.name,
+            'size': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
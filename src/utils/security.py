@@ -1,22 +1,177 @@
+import asyncio
+import math
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 from datetime import UTC, datetime, timedelta
 
-import jwt
 from fastapi import HTTPException, Request, status
 from jwt import ExpiredSignatureError, InvalidTokenError
 from passlib.context import CryptContext
 from src.config import settings
+from src.utils.admission import AdmissionLimiter
+from src.utils.bloom import BloomFilter
+from src.utils.jwt_codec import TokenCodec
+from src.utils.metrics import registry
+from src.utils.token_cache import TokenCache
+
+# Contexte partagé, reconfiguré par configure_password_context()
+pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+_bcrypt_rounds: int | None = None
 
 
 def hash_password(password: str) -> str:
-    pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
     return pwd_context.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
+
+def configure_password_context(rounds: int) -> None:
+    """
+    Set the bcrypt cost of the shared context.
+
+    New hashes use this cost, and hashes made with a lower cost are reported
+    by password_needs_rehash(). Stronger hashes are kept as they are: a
+    login never downgrades a hash, and workers calibrated to different costs
+    cannot rehash the same account back and forth.
+
+    Args:
+        rounds (int): The bcrypt work factor (log2 of the iterations).
+    """
+    global _bcrypt_rounds
+
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+    _bcrypt_rounds = rounds
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: float = settings.BCRYPT_TARGET_MS,
+    min_rounds: int = settings.BCRYPT_MIN_ROUNDS,
+    max_rounds: int = settings.BCRYPT_MAX_ROUNDS,
+) -> int:
+    """
+    Find the bcrypt cost whose hashing time fits the latency budget on this host.
+
+    Each extra round doubles the work, so one measure at min_rounds is enough.
+
+    Args:
+        target_ms (float): Latency budget for one hash, in milliseconds.
+        min_rounds (int): Lowest cost accepted.
+        max_rounds (int): Highest cost accepted.
+
+    Returns:
+        int: The highest cost that stays within the budget, clamped to the bounds.
+    """
+    hasher = pwd_context.handler('bcrypt').using(rounds=min_rounds)
+    elapsed_ms = math.inf
+    for _ in range(2):
+        start = time.perf_counter()
+        hasher.hash('calibration')
+        elapsed_ms = min(elapsed_ms, (time.perf_counter() - start) * 1000)
+
+    extra_rounds = math.floor(math.log2(target_ms / elapsed_ms)) if elapsed_ms else 0
+    return max(min_rounds, min(max_rounds, min_rounds + extra_rounds))
+
+
+# Pool de process pour bcrypt : le hachage ne bloque plus la boucle asyncio
+_hash_executor: ProcessPoolExecutor | None = None
+hashing_limiter = AdmissionLimiter(
+    max_concurrency=settings.HASH_MAX_CONCURRENCY
+    or settings.PASSWORD_HASH_WORKERS
+    or 1,
+    max_queue=settings.HASH_MAX_QUEUE,
+    name='password_hashing',
+)
+
+
+def start_hash_pool(max_workers: int = settings.PASSWORD_HASH_WORKERS) -> None:
+    """
+    Start the process pool used by the async hashing helpers.
+
+    Args:
+        max_workers (int): Number of worker processes. 0 keeps the default
+            thread pool of the event loop (bcrypt releases the GIL).
+    """
+    global _hash_executor
+
+    if _hash_executor is not None or max_workers <= 0:
+        return
+    _hash_executor = ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        # Les process enfants doivent utiliser le même coût que le parent
+        initializer=configure_password_context if _bcrypt_rounds else None,
+        initargs=(_bcrypt_rounds,) if _bcrypt_rounds else (),
+    )
+
+
+def shutdown_hash_pool() -> None:
+    global _hash_executor
+
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True, cancel_futures=True)
+        _hash_executor = None
+
+
+# Mesuré côté boucle asyncio : aller-retour vers le pool inclus, attente
+# d'admission exclue (voir hashing_limiter.stats())
+password_hash_duration_seconds = registry.histogram(
+    'password_hash_duration_seconds',
+    'bcrypt hash and verify time on the hashing pool.',
+    ('operation',),
+)
+
+
+async def _run_hash_job(operation: str, func, *args):
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    try:
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        password_hash_duration_seconds.observe(time.perf_counter() - start, operation)
+
+
+async def hash_password_async(password: str) -> str:
+    async with hashing_limiter.slot():
+        return await _run_hash_job('hash', hash_password, password)
+
+
+async def hash_passwords_async(passwords: list[str]) -> list[str]:
+    """
+    Hash a batch of passwords in parallel on the hashing pool.
+
+    Meant for bulk imports: it bypasses the per-request admission limiter,
+    but keeps at most two jobs in flight per worker (one running, one ready
+    to start) so that interactive logins and registrations are interleaved
+    instead of queued behind the whole batch.
+    """
+    in_flight = asyncio.Semaphore(2 * max(1, settings.PASSWORD_HASH_WORKERS))
+
+    async def hash_one(password: str) -> str:
+        async with in_flight:
+            return await _run_hash_job('hash', hash_password, password)
+
+    return await asyncio.gather(*(hash_one(password) for password in passwords))
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    async with hashing_limiter.slot():
+        return await _run_hash_job(
+            'verify', verify_password, plain_password, hashed_password
+        )
+
+
+# Encodeur/décodeur précompilé pour l'algorithme configuré (PyJWT en secours)
+token_codec = TokenCodec(key=settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
 def create_access_token(
     data: dict,
     expires_delta: timedelta = timedelta(minutes=settings.JWT_ACCESS_EXPIRATION_IN_MIN),
@@ -25,11 +180,7 @@ def create_access_token(
     to_encode = data.copy()
     expire = datetime.now(UTC) + expires_delta
     to_encode.update({'exp': expire})
-    return jwt.encode(
-        payload=to_encode,
-        key=settings.JWT_SECRET_KEY,
-        algorithm=settings.JWT_ALGORITHM,
-    )
+    return token_codec.encode(to_encode)
 
 
 def create_refresh_token(
@@ -41,12 +192,43 @@ def create_refresh_token(
     # expires_delta = timedelta(seconds=20)
     to_encode = data.copy()
     expire = datetime.now(UTC) + expires_delta
+    # Le jti identifie le token pour la rotation et la révocation
+    to_encode.setdefault('jti', uuid.uuid4().hex)
     to_encode.update({'exp': expire})
-    return jwt.encode(
-        payload=to_encode,
-        key=settings.JWT_SECRET_KEY,
-        algorithm=settings.JWT_ALGORITHM,
-    )
+    return token_codec.encode(to_encode)
+
+
+# jti des refresh tokens utilisés ou révoqués : un négatif évite toute requête DB
+revoked_refresh_jtis = BloomFilter(capacity=settings.REVOKED_JTI_BLOOM_CAPACITY)
+
+access_token_cache = TokenCache(
+    maxsize=settings.ACCESS_TOKEN_CACHE_SIZE, name='access_token'
+)
+
+
+jwt_decode_duration_seconds = registry.histogram(
+    'jwt_decode_duration_seconds',
+    'JWT signature check and claims decoding time (cache misses only).',
+    ('token',),
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025),
+)
+
+
+def _decode_token(token: str, token_type: str) -> dict:
+    start = time.perf_counter()
+    try:
+        return token_codec.decode(token)
+    finally:
+        jwt_decode_duration_seconds.observe(time.perf_counter() - start, token_type)
+
+
+def decode_access_token(token: str) -> dict:
+    # Le payload mis en cache a déjà été vérifié (signature + exp)
+    payload = access_token_cache.get(token)
+    if payload is None:
+        payload = _decode_token(token, 'access')
+        access_token_cache.set(token, payload)
+    return payload
 
 
 def decode_refresh_token_from_cookie(request: Request):
@@ -58,9 +240,10 @@ def decode_refresh_token_from_cookie(request: Request):
         )
 
     try:
-        payload = jwt.decode(
-            token, key=settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = _decode_token(token, 'refresh')
+
+        if not isinstance(payload.get('jti'), str):
+            raise InvalidTokenError('Missing jti claim.')
 
         return payload
 
@@ -0,0 +1,64 @@
+from collections.abc import Iterable
+from operator import attrgetter
+from typing import TypedDict
+
+from fastapi import Response, status
+from pydantic import TypeAdapter
+from src.schemes.user import UserPublic
+
+USER_PUBLIC_FIELDS = tuple(UserPublic.model_fields)
+
+# Miroir de UserPublic en TypedDict : sérialisé en Rust, sans instancier de modèle
+UserPublicDict = TypedDict(
+    'UserPublicDict',
+    {name: field.annotation for name, field in UserPublic.model_fields.items()},
+)
+
+# Sérialiseurs compilés une seule fois, au chargement du module
+user_adapter = TypeAdapter(UserPublicDict)
+users_adapter = TypeAdapter(list[UserPublicDict])
+_public_values = attrgetter(*USER_PUBLIC_FIELDS)
+
+
+def _public_dict(user) -> dict:
+    return dict(zip(USER_PUBLIC_FIELDS, _public_values(user)))
+
+
+def user_json(user) -> bytes:
+    """
+    Dump the public fields of a user straight to JSON bytes.
+
+    The values are read from an ORM row, already typed by its columns, so
+    they are serialized without being validated again (which would build a
+    UserPublic model per row). Only the UserPublic fields are read.
+    """
+    return user_adapter.dump_json(_public_dict(user))
+
+
+def users_json(users: Iterable) -> bytes:
+    return users_adapter.dump_json([_public_dict(user) for user in users])
+
+
+def json_response(
+    body: bytes, status_code: int = status.HTTP_200_OK, headers: dict | None = None
+) -> Response:
+    # Une Response renvoyée telle quelle court-circuite le response_model de
+    # FastAPI, qui ne sert plus qu'au schéma OpenAPI
+    return Response(
+        content=body,
+        status_code=status_code,
+        headers=headers,
+        media_type='application/json',
+    )
+
+
+def user_response(
+    user, status_code: int = status.HTTP_200_OK, headers: dict | None = None
+) -> Response:
+    return json_response(user_json(user), status_code=status_code, headers=headers)
+
+
+def users_response(
+    users: Iterable, status_code: int = status.HTTP_200_OK, headers: dict | None = None
+) -> Response:
+    return json_response(users_json(users), status_code=status_code, headers=headers)
@@ -0,0 +1,76 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified JWT payloads.
+
+    Entries are keyed by a SHA-256 digest of the token, so raw tokens are never
+    kept in memory, and disappear once the token's `exp` is reached or when the
+    cache is full.
+    """
+
+    def __init__(self, maxsize: int, name: str = 'token_cache'):
+        self.name = name
+        self.maxsize = maxsize
+        # digest -> (payload, exp)
+        self._entries: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str, now: float | None = None) -> dict | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            payload, exp = entry
+            if exp > (time.time() if now is None else now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return payload
+            del self._entries[key]
+
+        self.misses += 1
+        return None
+
+    def set(self, token: str, payload: dict) -> None:
+        exp = payload.get('exp')
+        # Sans expiration, la durée de vie de l'entrée ne serait pas bornée
+        if self.maxsize <= 0 or not isinstance(exp, int | float):
+            return
+
+        self._entries[self._key(token)] = (payload, exp)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+        # Purge au fil de l'eau des entrées expirées les moins récemment utilisées
+        now = time.time()
+        while self._entries:
+            _, oldest_exp = next(iter(self._entries.values()))
+            if oldest_exp > now:
+                break
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'name': self.name,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
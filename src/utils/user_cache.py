@@ -0,0 +1,110 @@
+import time
+import uuid
+from collections import OrderedDict
+
+from src.db.models import User
+
+
+class UserCache:
+    """
+    TTL + LRU cache of User rows, indexed by username and by uid.
+
+    Rows are stored as plain dicts and rebuilt as detached User instances on
+    every hit, so callers can never mutate a shared object or attach it to a
+    session by accident. Use it on read paths only; writers must invalidate.
+    A row read while an invalidation happened is not stored, so a read racing
+    a write cannot put a stale row back in the cache.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float, name: str = 'user'):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        # username -> (données de la ligne, date d'expiration)
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._uid_index: dict[uuid.UUID, str] = {}
+        # Incrémenté à chaque invalidation : les lignes lues avant sont écartées
+        self.version = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_by_username(self, username: str) -> User | None:
+        entry = self._entries.get(username)
+
+        if entry is not None:
+            data, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(username)
+                self.hits += 1
+                return User.model_validate(data)
+            self._remove(username)
+
+        self.misses += 1
+        return None
+
+    def get_by_uid(self, uid: uuid.UUID) -> User | None:
+        username = self._uid_index.get(uid)
+        if username is None:
+            self.misses += 1
+            return None
+        return self.get_by_username(username)
+
+    def set(self, user: User, version: int) -> None:
+        """
+        Store a row unless it may already be stale.
+
+        Args:
+            user (User): The row read from the database.
+            version (int): The cache version read before querying the database.
+        """
+        if self.maxsize <= 0 or version != self.version:
+            return
+
+        # Un uid déjà indexé sous un autre username correspond à un renommage
+        self._discard(user.username, user.uid)
+        self._entries[user.username] = (
+            user.model_dump(),
+            time.monotonic() + self.ttl_seconds,
+        )
+        self._uid_index[user.uid] = user.username
+
+        if len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(
+        self, username: str | None = None, uid: uuid.UUID | None = None
+    ) -> None:
+        self.version += 1
+        self._discard(username, uid)
+
+    def _discard(self, username: str | None, uid: uuid.UUID | None) -> None:
+        if uid is not None and uid in self._uid_index:
+            self._remove(self._uid_index[uid])
+        if username is not None:
+            self._remove(username)
+
+    def _remove(self, username: str) -> None:
+        entry = self._entries.pop(username, None)
+        if entry is not None:
+            self._uid_index.pop(entry[0]['uid'], None)
+
+    def clear(self) -> None:
+        self.version += 1
+        self._entries.clear()
+        self._uid_index.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'name': self.name,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }